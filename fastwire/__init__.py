@@ -3,15 +3,49 @@
 Created on Sun Jul 21 22:06:32 2019
 
 @author: Reuben
+
+The core classes are imported with the package. Extras that need heavier
+modules, such as multiprocessing, are only imported when they're first used.
+
 """
 
+import importlib
+
 from . import settings
 from .box import Box
-from .container import Container
+from .container import Container, SignalSet
 from .wire import WireBox, WireContainer, Wire, wire, wire_container, \
     wire_box, get_wire_box
-from .signal import SignalBox, SignalContainer, Signal, signal, \
-    signal_container, signal_box, get_signal_box
-from .condition import Condition
+from .signal import SignalBox, SignalContainer, Signal, STOP, signal, \
+    signal_container, signal_box, get_signal_box, disconnect_all, \
+    connections, connection_count, leak_report, EmitError, ReentryError
+from .condition import Condition, C
 from .decorate import receive, supply, fn_receive, fn_supply
 from .wired import Wired
+
+_lazy = {'SignalBridge': 'bridge',
+         'SharedRing': 'shm',
+         'RingSubscriber': 'shm',
+         'BatchSignal': 'batch',
+         'QueuedSignal': 'queued',
+         'TimerService': 'timer',
+         'VectorCondition': 'vector',
+         'Between': 'vector',
+         'export_topology': 'topology',
+         'apply_topology': 'topology',
+         'save_topology': 'topology',
+         'load_topology': 'topology'}
+
+
+def __getattr__(name):
+    try:
+        module = _lazy[name]
+    except KeyError:
+        raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+    value = getattr(importlib.import_module('.' + module, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(list(globals()) + list(_lazy))
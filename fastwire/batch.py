@@ -0,0 +1,215 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 08:20:44 2026
+
+@author: Reuben
+
+The batch module provides a Signal that accumulates emitted numeric values
+into preallocated NumPy arrays. Receivers connected with batch=True receive
+the values as column batches - one array per key word argument - instead of
+once per emit, so they can do vectorised work. Other receivers are called
+on each emit as normal.
+
+"""
+
+import time
+
+from .signal import Signal
+
+
+class BatchSignal(Signal):
+    ''' A Signal that delivers emitted values to batch receivers in columns
+
+    Args:
+        name (str): A name of the signal [optional]
+        doc (str): A documentation string for the signal [optional]
+        batch_size (int): The number of emits in each batch.
+        interval (float): An optional maximum age of a batch in seconds.
+            When it is exceeded, the batch is delivered on the next emit.
+        dtype (str, dict): The NumPy dtype of the columns, or a dictionary of
+            dtypes by key word. Defaults to 'float64'.
+        **kwargs: Other key word arguments for Signal.
+
+    Note:
+        Batch receivers are called with one array per key word argument. Each
+        array contains the values from each emit in the batch. Values for
+        floating point columns are NaN for emits that did not include them.
+        Conditions only apply to receivers that are not batch receivers.
+        Unlike Signal, a BatchSignal should only be emitted from one thread
+        at a time.
+    '''
+
+    def __init__(self, name=None, doc=None, batch_size=1024, interval=None,
+                 dtype='float64', **kwargs):
+        import numpy as np
+        self._np = np
+        self._batch_size = batch_size
+        self._interval = interval
+        self._dtype = dtype
+        super().__init__(name=name, doc=doc, **kwargs)
+
+    def _new_batch(self):
+        self._columns = {}
+        self._n = 0
+        self._started = None
+
+    def _column(self, key):
+        np = self._np
+        dtype = self._dtype
+        if isinstance(dtype, dict):
+            dtype = dtype.get(key, 'float64')
+        dtype = np.dtype(dtype)
+        if dtype.kind in 'fc':
+            col = np.full(self._batch_size, np.nan, dtype=dtype)
+        else:
+            col = np.zeros(self._batch_size, dtype=dtype)
+        self._columns[key] = col
+        return col
+
+    def connect(self, receiver, priority=0, batch=False, **receiver_kwargs):
+        ''' Store weakref of receiver function or method to call
+
+        Args:
+            receiver (callable): A callable receiver
+            priority (int, float): Receivers with higher priorities are
+                called first. Defaults to 0.
+            batch (bool): True to receive column batches instead of each
+                emit.
+            kwargs: Optional key word arguments
+
+        Returns:
+            float: A receiver id that can be used to disconnect
+        '''
+        receiver_id = super().connect(receiver, priority=priority,
+                                      **receiver_kwargs)
+        if batch:
+            self._batch_ids.add(receiver_id)
+            self._sort()
+        return receiver_id
+
+    def disconnect(self, receiver_id):
+        ''' Disconnect a receiver
+
+        Args:
+            receiver_id (int): The id of the receiver.
+        '''
+        self._batch_ids.discard(receiver_id)
+        return super().disconnect(receiver_id)
+
+    def _insert(self, receiver_id):
+        super()._insert(receiver_id)
+        self._sort()
+
+    def _remove(self, receiver_id, priority):
+        super()._remove(receiver_id, priority)
+        self._sort()
+
+    def _sort(self):
+        ''' Precompute the order that receivers are called in '''
+        super()._sort()
+        batch_ids = self._batch_ids
+        dispatch = self._dispatch
+        self._batch_dispatch = tuple([e for e in dispatch
+                                      if e[0] in batch_ids])
+        self._dispatch = tuple([e for e in dispatch
+                                if e[0] not in batch_ids])
+
+    def _buffer(self, kwargs):
+        n = self._n
+        if n == 0 and self._interval is not None:
+            self._started = time.monotonic()
+        columns = self._columns
+        for key, value in kwargs.items():
+            try:
+                columns[key][n] = value
+            except KeyError:
+                self._column(key)[n] = value
+        n += 1
+        self._n = n
+        if n == self._batch_size:
+            self.flush()
+        elif (self._started is not None
+              and time.monotonic() - self._started >= self._interval):
+            self.flush()
+
+    def _emit(self, **kwargs):
+        ''' The standard emit method
+
+        Args:
+            **kwargs: Key word arguments.
+        '''
+        if self._dispatch:
+            super()._emit(**kwargs)
+        if self._batch_dispatch:
+            self._buffer(kwargs)
+
+    def _filtered_emit(self, **kwargs):
+        ''' An emit method that filters key word arguments for receivers
+
+        Args:
+            **kwargs: Key word arguments.
+        '''
+        if self._dispatch:
+            super()._filtered_emit(**kwargs)
+        if self._batch_dispatch:
+            self._buffer(kwargs)
+
+    def _conditioned_emit(self, **kwargs):
+        ''' A conditioned emit method
+
+        Args:
+            **kwargs: Key word arguments.
+        '''
+        if self._dispatch:
+            super()._conditioned_emit(**kwargs)
+        if self._batch_dispatch:
+            self._buffer(kwargs)
+
+    def _budgeted_emit(self, **kwargs):
+        ''' An emit method that times receivers against the budget
+
+        Args:
+            **kwargs: Key word arguments.
+        '''
+        if self._dispatch:
+            super()._budgeted_emit(**kwargs)
+        if self._batch_dispatch:
+            self._buffer(kwargs)
+
+    def _isolated_emit(self, **kwargs):
+        ''' An emit method that isolates receiver exceptions
+
+        Args:
+            **kwargs: Key word arguments.
+        '''
+        if self._dispatch:
+            super()._isolated_emit(**kwargs)
+        if self._batch_dispatch:
+            self._buffer(kwargs)
+
+    @property
+    def pending(self):
+        ''' The number of emits waiting to be delivered in a batch '''
+        return self._n
+
+    def flush(self):
+        ''' Deliver the current batch to batch receivers now '''
+        n = self._n
+        if n == 0:
+            return
+        if n == self._batch_size:
+            batch = self._columns
+        else:
+            batch = {key: col[:n] for key, col in self._columns.items()}
+        self._new_batch()
+        for receiver_id, ref, weak in self._batch_dispatch:
+            receiver = ref() if weak else ref
+            if receiver is not None:
+                receiver(**batch)
+
+    def reset(self):
+        ''' Reset the signal, discarding any pending batch '''
+        super().reset()
+        self._batch_ids = set()
+        self._batch_dispatch = ()
+        self._new_batch()
@@ -3,12 +3,30 @@
 Created on Wed Jul 31 12:56:25 2019
 
 @author: Reuben
+
+The active container of each box is held in a context variable, so each
+thread and asyncio task can have its own active container. Threads start with
+the 'default' container active, and asyncio tasks start with the active
+containers of the code that created them.
+
 """
 
+import contextlib
+import contextvars
+import gc
+import itertools
 import weakref
 import functools
+import threading
+
+from . import decorate, container
+
+
+# Maps box keys to active container ids. Dictionaries are copied on write, so
+# that changes never affect other contexts.
+_active_cids = contextvars.ContextVar('fastwire_active_cids', default={})
+_box_keys = itertools.count()
 
-from . import decorate
 
 class Box():
     ''' A collection of containers 
@@ -20,6 +38,10 @@ class Box():
     '''
     def __init__(self, container_cls):
         self._container_cls = container_cls
+        self._lock = threading.RLock()
+        self._key = next(_box_keys)
+        self._handles = container.Handles()
+        self._index_fields = []
         self._cs = {}
         self._next_cid = 0
         self.add('default')
@@ -48,10 +70,13 @@ class Box():
         Note:
             Container id is available via container.id.
         '''
-        cid = self._next_cid if cid is None else cid
-        c = self._container_cls(cid)
-        self._cs[cid] = c
-        self._next_cid += 1
+        with self._lock:
+            cid = self._next_cid if cid is None else cid
+            c = self._container_cls(cid, handles=self._handles)
+            for field in self._index_fields:
+                c.index_attr(field)
+            self._cs[cid] = c
+            self._next_cid += 1
         if remove_with is not None:
             self.remove_with(remove_with, cid=cid)
         if activate:
@@ -74,20 +99,61 @@ class Box():
         
         Args:
             cid (int, str): The container reference '''
-        try:
-            del self._cs[cid]
-            if cid == self._active:
-                self._active = 'default'
-        except KeyError:
-            pass
+        with self._lock:
+            try:
+                del self._cs[cid]
+                if cid == self._active:
+                    self._active = 'default'
+            except KeyError:
+                pass
         
     def set_active(self, cid):
-        ''' Set the active container 
+        ''' Set the active container in the current context
         
         Args:
             cid(int, str): The container reference
+            
+        Note:
+            This only affects the current thread or asyncio task. Use
+            the activate method to temporarily set the active container.
+        '''
+        cids = _active_cids.get()
+        if cids.get(self._key, 'default') == cid:
+            return
+        cids = cids.copy()
+        if cid == 'default':
+            del cids[self._key]
+        else:
+            cids[self._key] = cid
+        _active_cids.set(cids)
+        
+    @property
+    def _active(self):
+        return _active_cids.get().get(self._key, 'default')
+    
+    @_active.setter
+    def _active(self, cid):
+        self.set_active(cid)
+
+    @contextlib.contextmanager
+    def activate(self, cid):
+        ''' A context manager that temporarily sets the active container
+        
+        Args:
+            cid(int, str): The container reference. The container is
+                created if it does not exist.
+                
+        Yields:
+            Container: The container.
         '''
-        self._active = cid
+        c = self.get_container(cid)
+        cids = _active_cids.get().copy()
+        cids[self._key] = cid
+        token = _active_cids.set(cids)
+        try:
+            yield c
+        finally:
+            _active_cids.reset(token)
         
     @property
     def active(self):
@@ -98,7 +164,16 @@ class Box():
         ''' Return the currently active container '''
         if self._active is None:
             return None
-        return self._cs[self._active]
+        return self._active_container()
+
+    def _active_container(self):
+        ''' Return the active container, or the default container if the
+        active one has been removed (perhaps from another thread) '''
+        cs = self._cs
+        try:
+            return cs[_active_cids.get().get(self._key, 'default')]
+        except KeyError:
+            return cs['default']
         
     def get(self, name=None, doc=None, attrs=None, **kwargs):
         ''' Create or get a new wire/signal instance in the active container
@@ -113,20 +188,118 @@ class Box():
     
     def __getitem__(self, name):
         ''' Get or create a signal in the currently active container '''
-        return self._cs[self._active][name]
+        return self._active_container()[name]
+    
+    def handle(self, name):
+        ''' Return the integer handle for a signal name 
+        
+        Args:
+            name (str): The signal name.
+            
+        Returns:
+            int: The handle, which can be passed to the 'at' method. The same
+            handle is used for the name in all containers in the box.
+        '''
+        return self._handles.get(name)
+    
+    def at(self, handle, **kwargs):
+        ''' Get or create a signal in the active container given its handle
+        
+        Args:
+            handle (int): The handle of the signal name.
+            **kwargs: Key word arguments passed to the container's 'get' 
+                method if the signal needs to be created.
+        '''
+        return self._active_container().at(handle, **kwargs)
+    
+    def index_attr(self, field):
+        ''' Index signals by an attribute field in all containers
+        
+        Args:
+            field (str): The key in signal attrs dictionaries to index.
+        '''
+        with self._lock:
+            if field not in self._index_fields:
+                self._index_fields.append(field)
+            for c in list(self._cs.values()):
+                c.index_attr(field)
+    
+    def query(self, **attrs):
+        ''' Find signals with particular attribute values in all containers
+        
+        Args:
+            **attrs: The attribute values to match.
+            
+        Returns:
+            SignalSet: The signals whose attrs match all the given values.
+        '''
+        found = container.SignalSet()
+        for c in list(self._cs.values()):
+            found.extend(c.query(**attrs))
+        return found
+    
+    def memory_report(self):
+        ''' Report the number and approximate size of signals and receivers
+        
+        This only visits the box's own containers and signals, so it's cheap
+        enough to run periodically.
+        
+        Returns:
+            dict: A dictionary with a 'containers' dictionary of container
+            reports (see Container.memory_report) by container id, and a
+            'total' report for the whole box.
+        '''
+        reports = {cid: c.memory_report()
+                   for cid, c in list(self._cs.items())}
+        total = container._empty_report()
+        for report in reports.values():
+            container._add_report(total, report)
+        return {'containers': reports, 'total': total}
+
+    def freeze(self, gc_freeze=True):
+        ''' Freeze the wiring in all containers, for example before forking
+        
+        Signals hold strong references to their current receivers, so emits
+        don't touch weak references, and all tracked objects are optionally
+        moved to the permanent garbage collector generation. Forked child
+        processes then write to fewer of the memory pages they share with
+        the parent when they emit and collect garbage.
+        
+        Args:
+            gc_freeze (bool): True to call gc.freeze after freezing. This
+                affects all objects in the process, not only this box.
+        '''
+        for c in list(self._cs.values()):
+            c.freeze_all()
+        if gc_freeze:
+            gc.freeze()
+            
+    def unfreeze(self):
+        ''' Unfreeze the wiring in all containers 
+        
+        Note:
+            This does not call gc.unfreeze.
+        '''
+        for c in list(self._cs.values()):
+            c.unfreeze_all()
     
     def reset_all(self):
         ''' Reset all wires in all containers '''
-        for key, container in self._cs.items():
-            container.reset_all()
+        for c in list(self._cs.values()):
+            c.reset_all()
             
     def get_container(self, cid=None):
         ''' Return the container given by a container id '''
         if cid is None:
             return self.get_active()
-        if cid not in self._cs:
-            self.add(cid=cid, activate=False)
-        return self._cs[cid]
+        try:
+            return self._cs[cid]
+        except KeyError:
+            pass
+        with self._lock:
+            if cid not in self._cs:
+                self.add(cid=cid, activate=False)
+            return self._cs[cid]
     
     def clear(self):
         ''' Clear all containers in the box '''
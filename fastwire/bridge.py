@@ -0,0 +1,274 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 09:12:40 2026
+
+@author: Reuben
+
+The bridge module mirrors signals between processes. A SignalBridge connects
+signals in selected containers of a SignalBox to a multiprocessing
+Connection, which may come from a multiprocessing Pipe or from a Unix domain
+socket. Emits on one side are collected into batches, serialised and sent,
+and then re-emitted on the matching Signal in the peer's SignalBox.
+
+Each batch is a pickled tuple of (new_keys, events). Signals are identified
+by a small integer key, and the container id and name for a key are only
+sent the first time that key is used.
+
+"""
+
+import logging
+import pickle
+import threading
+from multiprocessing.connection import Listener, Client
+
+logger = logging.getLogger(__name__)
+
+
+class SignalBridge():
+    ''' Mirror signals in a SignalBox with a peer process
+
+    Args:
+        conn (Connection): A multiprocessing Connection to the peer.
+        box (SignalBox): The box that contains the mirrored containers.
+        cids (list): An optional list of container ids to mirror. All
+            signals currently in these containers are attached.
+        batch_size (int): The maximum number of emits sent in one batch.
+        window (float): The maximum time, in seconds, that an emit waits
+            before its batch is sent.
+        start (bool): Start the background threads immediately.
+
+    Note:
+        Emits that are received from the peer are not sent back to it, but
+        emits made by receivers of those emits on other signals are.
+    '''
+
+    def __init__(self, conn, box, cids=None, batch_size=256, window=0.002,
+                 start=True):
+        self._conn = conn
+        self._box = box
+        self._batch_size = batch_size
+        self._window = window
+        self._pending = []
+        self._cond = threading.Condition()
+        self._send_lock = threading.Lock()
+        self._local = threading.local()
+        self._send_keys = {}
+        self._recv_keys = {}
+        self._forwarders = {}
+        self._threads = []
+        self._running = False
+        self._closing = False
+        self.sent = 0
+        self.received = 0
+        for cid in cids or []:
+            self.attach(cid)
+        if start:
+            self.start()
+
+    def attach(self, cid, names=None):
+        ''' Forward emits from signals in a container to the peer
+
+        Args:
+            cid (int, str): The container id.
+            names (list): Optional signal names. Signals that do not exist
+                yet are created. Defaults to all signals that are currently
+                in the container.
+        '''
+        c = self._box.get_container(cid)
+        names = list(c.keys()) if names is None else names
+        for name in names:
+            key = (cid, name)
+            if key in self._forwarders:
+                continue
+            forwarder = self._make_forwarder(cid, name)
+            signal = c.get(name)
+            receiver_id = signal.connect(forwarder)
+            self._forwarders[key] = (forwarder, signal, receiver_id)
+
+    def _make_forwarder(self, cid, name):
+        local = self._local
+        key = (cid, name)
+        def forward(**kwargs):
+            if getattr(local, 'key', None) == key:
+                return # Don't echo an emit back to the peer
+            self._add(cid, name, kwargs)
+        return forward
+
+    def _add(self, cid, name, kwargs):
+        with self._cond:
+            pending = self._pending
+            pending.append((cid, name, kwargs))
+            if len(pending) == 1:
+                self._cond.notify()
+            if len(pending) < self._batch_size:
+                return
+            self._pending = []
+        self._send(pending)
+
+    def _encode(self, pending):
+        new_keys = []
+        events = []
+        keys = self._send_keys
+        for cid, name, kwargs in pending:
+            try:
+                key = keys[(cid, name)]
+            except KeyError:
+                key = len(keys)
+                keys[(cid, name)] = key
+                new_keys.append((key, cid, name))
+            events.append((key, kwargs))
+        return pickle.dumps((new_keys, events),
+                            protocol=pickle.HIGHEST_PROTOCOL)
+
+    def _send(self, pending):
+        with self._send_lock:
+            if self._closing:
+                return
+            data = self._encode(pending)
+            try:
+                self._conn.send_bytes(data)
+            except (OSError, ValueError):
+                self._running = False
+                return
+            self.sent += len(pending)
+
+    def flush(self):
+        ''' Send any pending emits immediately '''
+        with self._cond:
+            pending = self._pending
+            self._pending = []
+        if pending:
+            self._send(pending)
+
+    def _flush_loop(self):
+        cond = self._cond
+        while self._running:
+            with cond:
+                while self._running and not self._pending:
+                    cond.wait()
+            if not self._running:
+                break
+            with cond:
+                cond.wait(self._window)
+            self.flush()
+
+    def _receive_loop(self):
+        try:
+            self._receive()
+        finally:
+            self._running = False
+            with self._cond:
+                self._cond.notify_all()
+
+    def _receive(self):
+        local = self._local
+        keys = self._recv_keys
+        box = self._box
+        while self._running:
+            try:
+                data = self._conn.recv_bytes()
+            except (EOFError, OSError):
+                break
+            if not data:
+                self._send_close() # The peer closed the bridge
+                break
+            try:
+                new_keys, events = pickle.loads(data)
+                for key, cid, name in new_keys:
+                    keys[key] = ((cid, name),
+                                 box.get_container(cid).get(name))
+            except Exception:
+                logger.exception('Could not read a batch from the peer.')
+                continue
+            for key, kwargs in events:
+                try:
+                    local.key, signal = keys[key]
+                    signal.emit(**kwargs)
+                except Exception:
+                    logger.exception('Emit of a signal from the peer failed.')
+            local.key = None
+            self.received += len(events)
+
+    def start(self):
+        ''' Start the background threads that send and receive batches '''
+        if self._running:
+            return
+        self._running = True
+        self._threads = [
+            threading.Thread(target=self._flush_loop, daemon=True),
+            threading.Thread(target=self._receive_loop, daemon=True)]
+        for thread in self._threads:
+            thread.start()
+
+    def _send_close(self):
+        with self._send_lock:
+            if self._closing:
+                return
+            self._closing = True
+            try:
+                self._conn.send_bytes(b'')
+            except (OSError, ValueError):
+                pass
+
+    def close(self):
+        ''' Send pending emits, stop the threads and close the connection '''
+        self.flush()
+        self._send_close()
+        self._running = False
+        with self._cond:
+            self._cond.notify_all()
+        for thread in self._threads:
+            thread.join(1)
+        self._conn.close()
+        for forwarder, signal, receiver_id in self._forwarders.values():
+            signal.disconnect(receiver_id)
+        self._forwarders.clear()
+
+    def join(self, timeout=None):
+        ''' Wait until the peer closes the bridge
+
+        Args:
+            timeout (float): An optional timeout in seconds.
+        '''
+        for thread in self._threads[1:]:
+            thread.join(timeout)
+
+    @property
+    def running(self):
+        ''' True if the bridge is sending and receiving '''
+        return self._running
+
+
+def listen(address, box, cids=None, authkey=None, **kwargs):
+    ''' Wait for a peer to connect to a Unix domain socket and bridge to it
+
+    Args:
+        address (str): The path of the socket.
+        box (SignalBox): The box that contains the mirrored containers.
+        cids (list): An optional list of container ids to mirror.
+        authkey (bytes): An optional authentication key.
+        **kwargs: Other key word arguments for SignalBridge.
+
+    Returns:
+        SignalBridge: The bridge.
+    '''
+    with Listener(address, family='AF_UNIX', authkey=authkey) as listener:
+        conn = listener.accept()
+    return SignalBridge(conn, box, cids, **kwargs)
+
+
+def connect(address, box, cids=None, authkey=None, **kwargs):
+    ''' Connect to a peer listening on a Unix domain socket and bridge to it
+
+    Args:
+        address (str): The path of the socket.
+        box (SignalBox): The box that contains the mirrored containers.
+        cids (list): An optional list of container ids to mirror.
+        authkey (bytes): An optional authentication key.
+        **kwargs: Other key word arguments for SignalBridge.
+
+    Returns:
+        SignalBridge: The bridge.
+    '''
+    conn = Client(address, family='AF_UNIX', authkey=authkey)
+    return SignalBridge(conn, box, cids, **kwargs)
@@ -26,3 +26,161 @@ class Condition():
         sender and the receiver.
         '''
         raise NotImplementedError()
+
+
+_OPS = {'eq': '==', 'ne': '!=', 'lt': '<', 'le': '<=', 'gt': '>',
+        'ge': '>=', 'in': 'in'}
+
+
+class C(Condition):
+    ''' A predicate on key word arguments that can be composed 
+    
+    Predicates are created with the class methods, such as C.eq, and 
+    combined with & (and), | (or) and ~ (not). When a predicate is added to
+    a Signal, it is compiled into a single function for each receiver, with
+    that receiver's key word arguments built in. Emit key word arguments
+    override receiver key word arguments of the same name. A comparison is
+    False if its key is in neither.
+    
+    Args:
+        op (str): The operation.
+        args (tuple): The operands.
+        
+    Example:
+        C.eq('mode', 'fast') & ~C.in_('id', ids)
+    '''
+    
+    def __init__(self, op, *args):
+        self._op = op
+        self._args = args
+        self.name = repr(self)
+        
+    @classmethod
+    def eq(cls, key, value):
+        ''' True if the argument 'key' equals value '''
+        return cls('eq', key, value)
+        
+    @classmethod
+    def ne(cls, key, value):
+        ''' True if the argument 'key' does not equal value '''
+        return cls('ne', key, value)
+        
+    @classmethod
+    def lt(cls, key, value):
+        ''' True if the argument 'key' is less than value '''
+        return cls('lt', key, value)
+        
+    @classmethod
+    def le(cls, key, value):
+        ''' True if the argument 'key' is less than or equal to value '''
+        return cls('le', key, value)
+        
+    @classmethod
+    def gt(cls, key, value):
+        ''' True if the argument 'key' is greater than value '''
+        return cls('gt', key, value)
+        
+    @classmethod
+    def ge(cls, key, value):
+        ''' True if the argument 'key' is greater than or equal to value '''
+        return cls('ge', key, value)
+        
+    @classmethod
+    def in_(cls, key, values):
+        ''' True if the argument 'key' is in values '''
+        if isinstance(values, (list, set)):
+            values = frozenset(values)
+        return cls('in', key, values)
+    
+    @classmethod
+    def test(cls, key, fn):
+        ''' True if fn returns a truthy value for the argument 'key' '''
+        return cls('test', key, fn)
+        
+    def __and__(self, other):
+        return C('and', self, other)
+    
+    def __or__(self, other):
+        return C('or', self, other)
+    
+    def __invert__(self):
+        return C('not', self)
+    
+    def __repr__(self):
+        op, args = self._op, self._args
+        if op == 'and':
+            return '(' + repr(args[0]) + ' & ' + repr(args[1]) + ')'
+        if op == 'or':
+            return '(' + repr(args[0]) + ' | ' + repr(args[1]) + ')'
+        if op == 'not':
+            return '~' + repr(args[0])
+        return 'C.' + op + '(' + repr(args[0]) + ', ' + repr(args[1]) + ')'
+    
+    def _expr(self, receiver_kwargs, consts):
+        ''' Return a Python expression for the predicate '''
+        op, args = self._op, self._args
+        if op in ('and', 'or'):
+            return ('(' + _expr(args[0], receiver_kwargs, consts) + ' ' + op +
+                    ' ' + _expr(args[1], receiver_kwargs, consts) + ')')
+        if op == 'not':
+            return '(not ' + _expr(args[0], receiver_kwargs, consts) + ')'
+        key = args[0]
+        k = _const(consts, key)
+        v = _const(consts, args[1])
+        if key in receiver_kwargs:
+            # Use the receiver's value unless the emit has the key
+            d = _const(consts, receiver_kwargs[key])
+            arg = 'kw.get(' + k + ', ' + d + ')'
+            present = ''
+        else:
+            arg = 'kw[' + k + ']'
+            present = k + ' in kw and '
+        if op == 'test':
+            return '(' + present + 'bool(' + v + '(' + arg + ')))'
+        return '(' + present + arg + ' ' + _OPS[op] + ' ' + v + ')'
+    
+    def check(self, **kwargs):
+        ''' Check the predicate against key word arguments 
+        
+        Returns:
+            bool: True if the predicate passes.
+        '''
+        return compile_conditions([self], {})(kwargs)
+
+
+def _const(consts, value):
+    ''' Add a constant to the namespace of a compiled predicate '''
+    name = '_' + str(len(consts))
+    consts[name] = value
+    return name
+
+
+def _expr(condition, receiver_kwargs, consts):
+    ''' Return a Python expression for any condition '''
+    if isinstance(condition, C):
+        return condition._expr(receiver_kwargs, consts)
+    c = _const(consts, condition)
+    r = _const(consts, receiver_kwargs)
+    return 'bool(' + c + '.check(**{**' + r + ', **kw}))'
+
+
+def compile_conditions(conditions, receiver_kwargs):
+    ''' Compile conditions into one predicate for a receiver 
+    
+    Args:
+        conditions (list): Condition instances. C predicates are compiled
+            inline. Other conditions have their check method called with the
+            receiver and emit key word arguments merged. Vectorised
+            conditions are skipped, as the signal checks them for all
+            receivers at once.
+        receiver_kwargs (dict): The receiver's key word arguments.
+        
+    Returns:
+        callable: A function that takes a dictionary of emit key word
+        arguments and returns True if all the conditions pass.
+    '''
+    consts = {}
+    parts = [_expr(c, receiver_kwargs, consts) for c in conditions
+             if not getattr(c, 'vectorised', False)]
+    source = 'lambda kw: ' + (' and '.join(parts) if parts else 'True')
+    return eval(source, consts)
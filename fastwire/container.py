@@ -3,17 +3,129 @@
 Created on Wed Jul 31 12:59:51 2019
 
 @author: Reuben
+
+Signal names can be resolved once to compact integer handles. Containers
+store their signals in a list indexed by handle as well, so looking up a
+signal by handle is a list index rather than a hashed dictionary lookup.
+Containers in the same Box share their handles, so a handle refers to the
+same signal name in every container of the box. A container that only has a
+few of the box's signals keeps the signals with large handles in a
+dictionary instead, so that its list doesn't grow with every name in the
+box.
+
+Containers can also index their signals by attribute. Once an attribute field
+is indexed, signals with particular attribute values can be found without
+scanning every signal in the container.
+
 """
 
 import functools
+import sys
+import threading
 
 from . import decorate
 
+
+def _empty_report():
+    return {key: {'count': 0, 'bytes': 0} for key in
+            ['signals', 'receivers', 'receiver_kwargs', 'conditions',
+             'finalizers']}
+
+
+def _add_report(total, report):
+    ''' Add the counts and bytes in a memory report to a total report '''
+    for key, values in report.items():
+        totals = total[key]
+        totals['count'] += values['count']
+        totals['bytes'] += values['bytes']
+
+
+class Handles():
+    ''' A table of compact integer handles for signal names '''
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.ids = {}
+        self.names = []
+        
+    def get(self, name):
+        ''' Return the handle for a name, adding it if required 
+        
+        Args:
+            name (str): The signal name.
+        '''
+        try:
+            return self.ids[name]
+        except KeyError:
+            pass
+        with self._lock:
+            if name not in self.ids:
+                self.ids[name] = len(self.names)
+                self.names.append(name)
+            return self.ids[name]
+
+
+class SignalSet(list):
+    ''' A list of signals that can be connected or muted together '''
+    
+    def connect(self, receiver, **receiver_kwargs):
+        ''' Connect a receiver to every signal
+        
+        Args:
+            receiver (callable): A callable receiver
+            **receiver_kwargs: Optional key word arguments
+            
+        Returns:
+            list: The receiver id from each signal, in order.
+        '''
+        return [s.connect(receiver, **receiver_kwargs) for s in self]
+    
+    def mute(self):
+        ''' Mute every signal '''
+        for s in self:
+            s.mute()
+            
+    def unmute(self):
+        ''' Unmute every signal '''
+        for s in self:
+            s.unmute()
+            
+    def reset(self):
+        ''' Reset every signal '''
+        for s in self:
+            s.reset()
+
+
+_MISSING = object()
+
+
+def _matches(s, attrs):
+    s_attrs = s.attrs
+    if s_attrs is None:
+        return False
+    for field, value in attrs.items():
+        if s_attrs.get(field, _MISSING) != value:
+            return False
+    return True
+
+
 class Container(dict):
-    ''' A dictionary-like collection of Signal instances '''
+    ''' A dictionary-like collection of Signal instances 
+    
+    Args:
+        signal_cls (class): The class of signals in the container.
+        cid (int, str): The container id.
+        handles (Handles): An optional table of handles to share with
+            other containers.
+    '''
     
-    def __init__(self, signal_cls, cid=None):
+    def __init__(self, signal_cls, cid=None, handles=None):
         self._signal_cls = signal_cls
+        self._lock = threading.RLock()
+        self._handles = Handles() if handles is None else handles
+        self._signals = []
+        self._sparse = {}
+        self._index = {}
         self.id = cid
         self.receive = functools.partial(decorate.receive, container=self)
         self.supply = functools.partial(decorate.supply, container=self)
@@ -28,30 +140,183 @@ class Container(dict):
             attrs (dict): Optional diction of signal attributes.
             must_exist (bool): True if the signal must already exist
         '''
-        name = len(self) if name is None else name
-        if name in self:
+        if name is not None and name in self:
             return self[name]
+        with self._lock:
+            name = len(self) if name is None else name
+            if name in self:
+                return self[name]
+            else:
+                if must_exist:
+                    raise KeyError('Signal "' + str(name) + '" must exist ' +
+                                   'already.')
+            s = self._signal_cls(name=name, doc=doc, attrs=attrs, **kwargs)
+            self[name] = s
+            self._store(self._handles.get(name), s)
+            if self._index and attrs:
+                self._add_to_index(s)
+        return s
+    
+    def _add_to_index(self, s):
+        attrs = s.attrs
+        for field, values in self._index.items():
+            value = attrs.get(field, _MISSING)
+            if value is _MISSING:
+                continue
+            try:
+                values.setdefault(value, []).append(s)
+            except TypeError:
+                pass # Unhashable values are found by scanning
+    
+    def index_attr(self, field):
+        ''' Index signals by an attribute field 
+        
+        Args:
+            field (str): The key in signal attrs dictionaries to index.
+        '''
+        with self._lock:
+            if field in self._index:
+                return
+            values = {}
+            for s in list(self.values()):
+                if s.attrs is None or field not in s.attrs:
+                    continue
+                try:
+                    values.setdefault(s.attrs[field], []).append(s)
+                except TypeError:
+                    pass
+            self._index[field] = values
+    
+    @property
+    def indexed_attrs(self):
+        ''' A list of indexed attribute fields '''
+        return list(self._index)
+    
+    def query(self, **attrs):
+        ''' Find signals with particular attribute values
+        
+        Args:
+            **attrs: The attribute values to match.
+            
+        Returns:
+            SignalSet: The signals whose attrs match all the given values.
+            
+        Note:
+            Only indexed fields avoid scanning all signals in the container.
+        '''
+        candidates = None
+        for field, value in attrs.items():
+            values = self._index.get(field)
+            if values is None:
+                continue
+            try:
+                found = values.get(value, ())
+            except TypeError:
+                continue
+            if candidates is None or len(found) < len(candidates):
+                candidates = found
+        if candidates is None:
+            candidates = list(self.values())
+        return SignalSet([s for s in candidates if _matches(s, attrs)])
+    
+    def _store(self, handle, s):
+        signals = self._signals
+        n = len(signals)
+        if handle < n:
+            signals[handle] = s
+        elif handle < 2 * len(self) + 8: # The list stays mostly full
+            signals.extend([None] * (handle - n))
+            signals.append(s)
         else:
-            if must_exist:
-                raise KeyError('Signal "' + str(name) + '" must exist ' +
-                               'already.')
-        s = self._signal_cls(name=name, doc=doc, attrs=attrs, **kwargs)
-        self[name] = s
+            self._sparse[handle] = s
+            return
+        self._sparse.pop(handle, None)
+    
+    def handle(self, name):
+        ''' Return the integer handle for a signal name 
+        
+        Args:
+            name (str): The signal name.
+            
+        Returns:
+            int: The handle, which can be passed to the 'at' method.
+        '''
+        return self._handles.get(name)
+    
+    def at(self, handle, **kwargs):
+        ''' Get or create a signal given its handle 
+        
+        Args:
+            handle (int): The handle of the signal name.
+            **kwargs: Key word arguments passed to the 'get' method if the
+                signal needs to be created.
+        '''
+        try:
+            s = self._signals[handle]
+        except IndexError:
+            s = self._sparse.get(handle)
+        if s is None:
+            with self._lock:
+                s = self.get(self._handles.names[handle], **kwargs)
+                self._store(handle, s)
         return s
     
+    def connect_map(self, mapping, **receiver_kwargs):
+        ''' Connect receivers to several signals at once
+        
+        Args:
+            mapping (dict): A dictionary of lists of receivers, with signal
+                names as keys. Signals are created if required.
+            **receiver_kwargs: Optional key word arguments for all receivers.
+            
+        Returns:
+            dict: Lists of receiver ids, with signal names as keys.
+        '''
+        return {name: self.get(name).connect_many(receivers, 
+                                                  **receiver_kwargs)
+                for name, receivers in mapping.items()}
+    
     def mute_all(self):
         ''' Mute all signals in the container '''
-        for key, signal in self.items():
+        for signal in list(self.values()):
             signal.mute()
 
     def unmute_all(self):
         ''' Unmute all signals in the container '''
-        for key, signal in self.items():
+        for signal in list(self.values()):
             signal.unmute()
 
+    def memory_report(self):
+        ''' Report the number and approximate size of the container's parts
+        
+        Returns:
+            dict: A dictionary with keys 'signals', 'receivers',
+            'receiver_kwargs', 'conditions' and 'finalizers'. Each value is
+            a dictionary with a 'count' and approximate 'bytes', summed over
+            all signals in the container. The container's own dictionaries
+            are included in the 'signals' bytes.
+        '''
+        report = _empty_report()
+        report['signals']['bytes'] = (sys.getsizeof(self)
+                                      + sys.getsizeof(self._signals)
+                                      + sys.getsizeof(self._sparse))
+        for signal in list(self.values()):
+            _add_report(report, signal.memory_report())
+        return report
+
+    def freeze_all(self):
+        ''' Freeze the receivers of all signals in the container '''
+        for signal in list(self.values()):
+            signal.freeze()
+
+    def unfreeze_all(self):
+        ''' Unfreeze the receivers of all signals in the container '''
+        for signal in list(self.values()):
+            signal.unfreeze()
+
     def reset_all(self):
         ''' Reset all wires in the contain '''
-        for key, signal in self.items():
+        for signal in list(self.values()):
             signal.reset()
     
     def __missing__(self, key):
@@ -9,8 +9,11 @@ automatically connecting methods and functions.
 
 """
 
+_NAME_TYPES = (str, int)
+
+
 def ensure_signal_obj(signal, box, container, receiver_limit=None):
-    if isinstance(signal, str) or isinstance(signal, int):
+    if isinstance(signal, _NAME_TYPES):
         if box is not None:
             s = box.get(name=signal, receiver_limit=receiver_limit)
         elif container is not None:
@@ -47,8 +50,17 @@ def receive(s, box=None, container=None, **receiver_kwargs):
                 # We don't want to append it to the superclass
                 owner._connected_signals = owner._connected_signals.copy()
             cs = owner._connected_signals
+            receiver_limit = receiver_kwargs.get('receiver_limit')
             for signal in s:
-                cs[name] = [signal, box, container, receiver_kwargs]
+                handle = None
+                if isinstance(signal, _NAME_TYPES):
+                    # Resolve names once here rather than per instance
+                    if box is not None:
+                        handle = box.handle(signal)
+                    elif container is not None:
+                        signal = container.get(name=signal,
+                                               receiver_limit=receiver_limit)
+                cs[name] = [signal, box, container, receiver_kwargs, handle]
             setattr(owner, name, self.fn) # Replace decorator with original function
         
     return Decorator
@@ -0,0 +1,218 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 15:02:37 2026
+
+@author: Reuben
+
+The queued module provides a Signal whose emits return immediately. Each
+emit is placed on a bounded queue, and one or more worker threads take emits
+off the queue and call the receivers, in the same way that Signal.emit
+would. This suits receivers that do slow I/O, such as logging or writing to
+a database.
+
+"""
+
+import logging
+import queue
+import threading
+import weakref
+
+from .signal import Signal
+
+logger = logging.getLogger(__name__)
+
+_STOP_WORKER = object()
+_SIGNAL_GONE = object()
+
+# The Signal methods that deliver each kind of queued emit
+_DELIVER = (Signal._emit, Signal._filtered_emit, Signal._conditioned_emit,
+            Signal._budgeted_emit, Signal._isolated_emit)
+
+
+def _work(ref, q):
+    ''' Deliver queued emits for a QueuedSignal
+
+    Args:
+        ref (weakref.ref): A weak reference to the signal, so that idle
+            workers don't keep it alive.
+        q (queue.Queue): The signal's queue.
+    '''
+    while True:
+        item = q.get()
+        try:
+            if item is _STOP_WORKER:
+                return
+            signal = ref()
+            if signal is None:
+                try:
+                    q.put_nowait(_SIGNAL_GONE) # Stop the next worker too
+                except queue.Full:
+                    pass
+                return
+            signal._deliver(item, q.qsize() + 1)
+            del signal
+        finally:
+            q.task_done()
+
+
+def _signal_gone(q):
+    try:
+        q.put_nowait(_SIGNAL_GONE)
+    except queue.Full:
+        pass # The workers will find that the signal has gone
+
+
+
+class QueuedSignal(Signal):
+    ''' A Signal that calls its receivers from worker threads
+
+    Args:
+        name (str): A name of the signal [optional]
+        doc (str): A documentation string for the signal [optional]
+        maxsize (int): The maximum number of emits waiting in the queue.
+        workers (int): The number of worker threads.
+        overflow (str): What an emit does when the queue is full. 'block'
+            waits for space, 'drop' discards the emit, and 'raise' raises
+            queue.Full.
+        **kwargs: Other key word arguments for Signal.
+
+    Note:
+        With more than one worker, receivers may be called for different
+        emits at the same time and out of order. Conditions are checked when
+        the receivers are called. The fetch methods are not queued.
+
+        The worker threads start on the first emit, and again on the next
+        emit after stop(). They only hold a weak reference to the signal, so
+        they stop when the signal is garbage collected. Any emits still in
+        the queue at that time are not delivered.
+    '''
+
+    def __init__(self, name=None, doc=None, maxsize=1024, workers=1,
+                 overflow='block', **kwargs):
+        if overflow not in ('block', 'drop', 'raise'):
+            raise ValueError('overflow must be "block", "drop" or "raise".')
+        self._queue = queue.Queue(maxsize)
+        self._overflow = overflow
+        self._n_workers = workers
+        self._threads = []
+        self._stats_lock = threading.Lock()
+        self.dropped = 0
+        self.delivered = 0
+        self.errors = 0
+        self.max_depth = 0
+        super().__init__(name=name, doc=doc, **kwargs)
+        weakref.finalize(self, _signal_gone, self._queue)
+
+    def _put(self, mode, kwargs):
+        if not self._threads:
+            self.start()
+        if self._overflow == 'block':
+            self._queue.put((mode, kwargs))
+            return
+        try:
+            self._queue.put_nowait((mode, kwargs))
+        except queue.Full:
+            if self._overflow == 'raise':
+                raise
+            with self._stats_lock:
+                self.dropped += 1
+
+    def _emit(self, **kwargs):
+        ''' Queue an emit
+
+        Args:
+            **kwargs: Key word arguments.
+        '''
+        self._put(0, kwargs)
+
+    def _filtered_emit(self, **kwargs):
+        ''' Queue an emit that filters key word arguments for receivers
+
+        Args:
+            **kwargs: Key word arguments.
+        '''
+        self._put(1, kwargs)
+
+    def _conditioned_emit(self, **kwargs):
+        ''' Queue a conditioned emit
+
+        Args:
+            **kwargs: Key word arguments.
+        '''
+        self._put(2, kwargs)
+
+    def _budgeted_emit(self, **kwargs):
+        ''' Queue an emit that times receivers against the budget
+
+        Args:
+            **kwargs: Key word arguments.
+        '''
+        self._put(3, kwargs)
+
+    def _isolated_emit(self, **kwargs):
+        ''' Queue an emit that isolates receiver exceptions
+
+        Args:
+            **kwargs: Key word arguments.
+        '''
+        self._put(4, kwargs)
+
+    def _deliver(self, item, depth):
+        mode, kwargs = item
+        failed = False
+        try:
+            _DELIVER[mode](self, **kwargs)
+        except Exception:
+            failed = True
+            logger.exception('Receiver of signal "%s" failed.', self.name)
+        with self._stats_lock:
+            self.delivered += 1
+            self.errors += failed
+            if depth > self.max_depth:
+                self.max_depth = depth
+
+    @property
+    def depth(self):
+        ''' The number of emits waiting in the queue '''
+        return self._queue.qsize()
+
+    def drain(self, timeout=None):
+        ''' Wait until every queued emit has been delivered
+
+        Args:
+            timeout (float): An optional timeout in seconds.
+
+        Returns:
+            bool: True if the queue was drained, or False on a timeout.
+        '''
+        q = self._queue
+        with q.all_tasks_done:
+            return q.all_tasks_done.wait_for(lambda: not q.unfinished_tasks,
+                                             timeout)
+
+    def start(self):
+        ''' Start the worker threads, if they're not running '''
+        with self._lock:
+            if self._threads:
+                return
+            ref = weakref.ref(self)
+            self._threads = [threading.Thread(target=_work,
+                                              args=(ref, self._queue),
+                                              daemon=True)
+                             for i in range(self._n_workers)]
+            for thread in self._threads:
+                thread.start()
+
+    def stop(self, timeout=None):
+        ''' Deliver the queued emits and then stop the worker threads
+
+        Args:
+            timeout (float): An optional timeout in seconds for each worker.
+        '''
+        with self._lock:
+            threads = self._threads
+            self._threads = []
+        for thread in threads:
+            self._queue.put(_STOP_WORKER)
+        for thread in threads:
+            thread.join(timeout)
@@ -0,0 +1,269 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 13:40:05 2026
+
+@author: Reuben
+
+The shm module sends fixed size frames between processes through a ring
+buffer in shared memory. The emitter writes each frame in place into the
+next slot of a SharedRing, and a RingSubscriber in each subscriber process
+emits its local Signal with a memoryview (or NumPy array) of the frame in
+shared memory, so frames are never pickled or copied.
+
+Each slot stores the sequence number of the frame it holds. Subscribers use
+these to detect when the writer has overwritten frames that they have not
+read yet (an overrun). Because frames are not copied, a frame passed to a
+receiver is only valid until the writer wraps around the ring to its slot.
+
+"""
+
+import logging
+import os
+import struct
+import threading
+from multiprocessing import shared_memory, resource_tracker
+
+logger = logging.getLogger(__name__)
+
+_HEADER = 64
+_ALIGN = 64
+_U64 = struct.Struct('<Q')
+_LAYOUT = struct.Struct('<QQQ')
+
+# The names of the blocks created by this process, which the resource tracker
+# should keep tracking when they're attached to here as well.
+_created = set()
+
+
+def _attach(name):
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        pass
+    # Before Python 3.13, attaching registers the memory with the resource
+    # tracker, which would unlink it when this process exits.
+    shm = shared_memory.SharedMemory(name=name)
+    if os.name == 'posix' and shm._name not in _created:
+        resource_tracker.unregister(shm._name, 'shared_memory')
+    return shm
+
+class SharedRing():
+    ''' A ring buffer of fixed size frames in shared memory
+
+    Args:
+        name (str): The name of the shared memory block. Leave as None to
+            create a new ring with a unique name.
+        frame_size (int): The size of each frame in bytes. Only needed when
+            creating a ring without a shape.
+        n_frames (int): The number of frames in the ring.
+        shape (tuple): An optional NumPy array shape for each frame.
+        dtype (str): The NumPy dtype for each frame. Defaults to 'float64'.
+        create (bool): True to create the ring, or False to attach to an
+            existing ring with the given name.
+
+    Note:
+        Only one process should write to a ring.
+    '''
+
+    def __init__(self, name=None, frame_size=None, n_frames=64, shape=None,
+                 dtype=None, create=True):
+        self._shape = shape
+        self._dtype = dtype
+        if shape is not None:
+            import numpy as np
+            self._dtype = np.dtype('float64' if dtype is None else dtype)
+            frame_size = int(np.prod(shape)) * self._dtype.itemsize
+        if create:
+            if frame_size is None:
+                raise ValueError('frame_size or shape must be given.')
+            stride = -(-(_U64.size + frame_size) // _ALIGN) * _ALIGN
+            self._shm = shared_memory.SharedMemory(
+                name=name, create=True, size=_HEADER + stride * n_frames)
+            _created.add(self._shm._name)
+            _LAYOUT.pack_into(self._shm.buf, 0, 0, frame_size, n_frames)
+        else:
+            self._shm = _attach(name)
+            head, frame_size, n_frames = _LAYOUT.unpack_from(self._shm.buf)
+            stride = -(-(_U64.size + frame_size) // _ALIGN) * _ALIGN
+        self.frame_size = frame_size
+        self.n_frames = n_frames
+        self._stride = stride
+        self._frames = [self._frame_view(i) for i in range(n_frames)]
+        self._head = self.head
+
+    def _frame_view(self, index):
+        start = _HEADER + index * self._stride + _U64.size
+        view = self._shm.buf[start:start + self.frame_size]
+        if self._shape is None:
+            return view
+        import numpy as np
+        return np.frombuffer(view, dtype=self._dtype).reshape(self._shape)
+
+    @property
+    def name(self):
+        ''' The name of the shared memory block '''
+        return self._shm.name
+
+    @property
+    def head(self):
+        ''' The sequence number of the last published frame '''
+        return _U64.unpack_from(self._shm.buf, 0)[0]
+
+    def seq(self, index):
+        ''' The sequence number of the frame held in a slot
+
+        Args:
+            index (int): The slot index.
+        '''
+        return _U64.unpack_from(self._shm.buf,
+                                _HEADER + index * self._stride)[0]
+
+    def frame(self, index):
+        ''' Return a view of the frame held in a slot
+
+        Args:
+            index (int): The slot index.
+        '''
+        return self._frames[index]
+
+    def claim(self):
+        ''' Return a writable view of the next frame
+
+        The frame is written in place, and then published with the publish
+        method.
+        '''
+        index = self._head % self.n_frames
+        _U64.pack_into(self._shm.buf, _HEADER + index * self._stride, 0)
+        return self._frames[index]
+
+    def publish(self):
+        ''' Publish the frame returned by claim to subscribers
+
+        Returns:
+            int: The sequence number of the frame.
+        '''
+        seq = self._head + 1
+        index = self._head % self.n_frames
+        buf = self._shm.buf
+        _U64.pack_into(buf, _HEADER + index * self._stride, seq)
+        _U64.pack_into(buf, 0, seq)
+        self._head = seq
+        return seq
+
+    def write(self, frame):
+        ''' Copy a frame into the ring and publish it
+
+        Args:
+            frame (bytes-like): The frame data, which must be frame_size
+                bytes long.
+
+        Returns:
+            int: The sequence number of the frame.
+
+        Note:
+            This method can be connected to a Signal as a receiver.
+        '''
+        view = self.claim()
+        if self._shape is None:
+            view[:] = memoryview(frame).cast('B')
+        else:
+            view[...] = frame
+        return self.publish()
+
+    def close(self):
+        ''' Close this process's access to the ring '''
+        self._frames = []
+        self._shm.close()
+
+    def unlink(self):
+        ''' Destroy the shared memory block (call from the creator) '''
+        self._shm.unlink()
+        _created.discard(self._shm._name)
+
+
+class RingSubscriber():
+    ''' Emit a local Signal for each new frame in a SharedRing
+
+    Args:
+        ring (SharedRing, str): A SharedRing, or the name of one to attach.
+        signal (Signal): The local signal to emit. It is emitted with the
+            key word arguments 'frame' (the view of the frame) and 'seq'
+            (the frame sequence number).
+        shape (tuple): An optional NumPy array shape when attaching by name.
+        dtype (str): An optional NumPy dtype when attaching by name.
+        latest (bool): True to start from the next published frame, or
+            False to start from the oldest frame still in the ring.
+    '''
+
+    def __init__(self, ring, signal, shape=None, dtype=None, latest=True):
+        if isinstance(ring, str):
+            ring = SharedRing(ring, shape=shape, dtype=dtype, create=False)
+        self.ring = ring
+        self._signal = signal
+        head = ring.head
+        self._next = head + 1 if latest else max(1, head - ring.n_frames + 1)
+        self.overruns = 0
+        self._thread = None
+        self._running = False
+
+    def poll(self):
+        ''' Emit the signal for every new frame
+
+        Returns:
+            int: The number of frames emitted.
+        '''
+        ring = self.ring
+        n_frames = ring.n_frames
+        head = ring.head
+        nxt = self._next
+        if head - nxt + 1 > n_frames:
+            self.overruns += head - nxt + 1 - n_frames
+            nxt = head - n_frames + 1
+        emit = self._signal.emit
+        frames = ring._frames
+        count = 0
+        for seq in range(nxt, head + 1):
+            self._next = seq + 1 # So a receiver error doesn't repeat frames
+            index = (seq - 1) % n_frames
+            if ring.seq(index) != seq:
+                self.overruns += 1 # Overwritten before it was read
+                continue
+            emit(frame=frames[index], seq=seq)
+            count += 1
+            if ring.seq(index) != seq:
+                self.overruns += 1 # Overwritten while it was read
+        self._next = head + 1
+        return count
+
+    def _loop(self, interval):
+        event = threading.Event()
+        try:
+            while self._running:
+                try:
+                    count = self.poll()
+                except Exception:
+                    logger.exception('Receiver of a ring frame failed.')
+                    continue
+                if count == 0:
+                    event.wait(interval)
+        finally:
+            self._running = False
+
+    def start(self, interval=0.001):
+        ''' Poll for frames in a background thread
+
+        Args:
+            interval (float): The time to wait, in seconds, when there are
+                no new frames.
+        '''
+        self._running = True
+        self._thread = threading.Thread(target=self._loop, args=(interval,),
+                                        daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        ''' Stop polling in the background '''
+        self._running = False
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
@@ -6,16 +6,357 @@ Created on Sat Jul 27 08:56:13 2019
 
 Signals can be connected to multiple callable receivers. The hold weak
 references to those callables, so that when they are garbage collected their
-references are removed automatically.
+references are removed automatically. Receivers can also be connected with
+strong=True, in which case the signal holds a normal reference instead, like
+a Wire does. A reverse index of the connections
+for each receiver object allows an object to be disconnected from every
+signal at once with disconnect_all, and its connections to be listed without
+scanning every signal. The index holds no references to receiver objects.
+
+Receivers are called in order of descending priority, and in the order they
+were connected for equal priorities. The order is precomputed when receivers
+are connected or disconnected, so emitting does not need to sort anything.
+A receiver can return STOP to prevent the remaining receivers from being
+called.
+
+Signals, containers and boxes are thread-safe. Changes such as connecting and
+disconnecting receivers take a lock and then publish a new immutable tuple of
+receivers. Emitting does not take any locks; it calls the receivers in the
+tuple that was current when the emit started.
 
 """
 
 
+import bisect
+import contextvars
+import os
+import sys
+import threading
+import time
 import weakref
 
-from . import box, container
+from . import box, container, condition as _condition
+
+
+class _Stop():
+    ''' The type of the STOP sentinel '''
+    def __repr__(self):
+        return 'STOP'
+
+
+STOP = _Stop()
+
+
+def _logger():
+    ''' Return the module's logger, importing logging when it's first used
+    so that it doesn't slow down importing fastwire '''
+    import logging
+    return logging.getLogger(__name__)
+
+
+try:
+    _ExceptionGroup = ExceptionGroup
+except NameError: # Before Python 3.11
+    class _ExceptionGroup(Exception):
+        def __init__(self, message, exceptions):
+            super().__init__(message, exceptions)
+            self.message = message
+            self.exceptions = tuple(exceptions)
+
+
+class EmitError(_ExceptionGroup):
+    ''' The exceptions raised by receivers during an isolated emit 
+    
+    It is an ExceptionGroup, so except* can handle the exceptions by type.
+    Before Python 3.11, the exceptions are in its 'exceptions' attribute.
+    '''
+
+
+class ReentryError(RuntimeError):
+    ''' A signal was emitted again while it was emitting, or the emits were
+    nested too deeply '''
+
+
+# The guarded signals that are emitting in the current thread or task,
+# outermost first, and the emits that were deferred until they finish.
+_emitting = contextvars.ContextVar('fastwire_emitting', default=())
+_pending = contextvars.ContextVar('fastwire_pending', default=None)
+
+
+# Maps the id of each receiver object (or function) to a set of
+# (signal, receiver_id) tuples for its connections. The lock is reentrant
+# because garbage collection can run a finalizer, which disconnects a
+# receiver, while it is held.
+_connections = {}
+_connections_lock = threading.RLock()
+
+
+class _SignalLock():
+    ''' A reentrant lock that knows how deeply it is held
+
+    Garbage collection can run a receiver's finalizer while the thread that
+    triggered it holds the lock, part way through an update to the dispatch
+    order. The finalizer then adds the receiver id to collected instead of
+    disconnecting it, and the outermost holder disconnects the collected
+    receivers before it releases the lock.
+    '''
+
+    def __init__(self, disconnect):
+        self._lock = threading.RLock()
+        self._disconnect = disconnect
+        self.depth = 0
+        self.collected = []
+
+    def __enter__(self):
+        self._lock.acquire()
+        self.depth += 1
+        return self
+
+    def __exit__(self, *exc):
+        try:
+            while self.depth == 1 and self.collected:
+                collected = self.collected
+                self.collected = []
+                for receiver_id in collected:
+                    self._disconnect(receiver_id)
+        finally:
+            self.depth -= 1
+            self._lock.release()
+
+
+def _ref(receiver, strong=False):
+    ''' Return a reference to a receiver and the object it is bound to 
+    
+    The reference is weak unless strong is True, in which case it is the
+    receiver itself.
+    '''
+    if hasattr(receiver, '__self__') and hasattr(receiver, '__func__'):
+        if strong:
+            return receiver, receiver.__self__
+        return weakref.WeakMethod(receiver), receiver.__self__
+    if strong:
+        return receiver, receiver
+    return weakref.ref(receiver), receiver
+
+
+# Caches the parameter names of receiver functions.
+_signature_cache = weakref.WeakKeyDictionary()
+
+
+def _fingerprint(receiver_kwargs):
+    ''' Return a hashable key for receiver key word arguments 
+    
+    Returns None if any of the values can't be hashed.
+    '''
+    try:
+        return frozenset([(k, v.__class__, v)
+                          for k, v in receiver_kwargs.items()])
+    except TypeError:
+        return None
+
+
+def _qualname(receiver):
+    ''' Return the qualified name of a receiver, for messages '''
+    func = getattr(receiver, '__func__', receiver)
+    name = getattr(func, '__qualname__', None)
+    if name is None:
+        return repr(receiver)
+    return getattr(func, '__module__', '?') + '.' + name
+
+
+# The queue of calls to demoted receivers, and the lock that guards its
+# creation. A single background thread makes the calls for every signal.
+_deferred = None
+_deferred_lock = threading.Lock()
+DEFERRED_MAXSIZE = 1024
+
+
+def _defer(receiver, kwargs):
+    ''' Call a receiver in the background thread
+    
+    Returns:
+        bool: False if the queue was full and the call was dropped.
+    '''
+    global _deferred
+    import queue
+    if _deferred is None:
+        with _deferred_lock:
+            if _deferred is None:
+                q = queue.Queue(DEFERRED_MAXSIZE)
+                threading.Thread(target=_run_deferred, args=(q,),
+                                 daemon=True).start()
+                _deferred = q
+    try:
+        _deferred.put_nowait((receiver, kwargs))
+    except queue.Full:
+        return False
+    return True
+
+
+def _run_deferred(q):
+    while True:
+        receiver, kwargs = q.get()
+        try:
+            receiver(**kwargs)
+        except Exception:
+            _logger().exception('Demoted receiver %s failed.',
+                                _qualname(receiver))
+        del receiver, kwargs
+
+
+def _forget_deferred():
+    ''' The background thread doesn't survive a fork '''
+    global _deferred
+    _deferred = None
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_forget_deferred)
+
+
+def _run_pending(pending):
+    ''' Deliver deferred emits, after the outermost emit has finished
+    
+    Emits deferred while these are delivered are added to the list, so
+    feedback is delivered in rounds rather than by recursion.
+    '''
+    try:
+        while pending:
+            signal, kwargs = pending.pop(0)
+            token = _emitting.set((signal,))
+            try:
+                signal._inner_emit(**kwargs)
+            finally:
+                _emitting.reset(token)
+    finally:
+        pending.clear()
+
+
+def _receiver_keys(receiver):
+    ''' Return a frozenset of the key word arguments a receiver accepts 
+    
+    Returns None if the receiver accepts any key word arguments (or its
+    signature can't be found).
+    '''
+    func = getattr(receiver, '__func__', receiver)
+    try:
+        keys = _signature_cache[func]
+    except KeyError:
+        keys = _key_sets(_signature_keys(func))
+        _signature_cache[func] = keys
+    except TypeError:
+        # Can't be weakly referenced
+        return _key_sets(_signature_keys(receiver))[0]
+    return keys[func is not receiver] # Skip self for bound methods
+
 
+def _key_sets(keys):
+    ''' Return the key sets for a function and for its bound methods '''
+    if keys is None:
+        return None, None
+    return frozenset(keys), frozenset(keys[1:])
+
+
+def _signature_keys(func):
+    import inspect
+    try:
+        params = inspect.signature(func).parameters.values()
+    except (TypeError, ValueError):
+        return None
+    keys = []
+    for param in params:
+        if param.kind == param.VAR_KEYWORD:
+            return None
+        if param.kind in (param.POSITIONAL_OR_KEYWORD, param.KEYWORD_ONLY):
+            keys.append(param.name)
+    return tuple(keys)
+
+
+def disconnect_all(obj):
+    ''' Disconnect an object from every signal it is connected to
+    
+    Args:
+        obj (object): An object whose methods are connected to signals, or
+            a function that is connected to signals.
+            
+    Returns:
+        int: The number of connections that were removed.
+    '''
+    with _connections_lock:
+        connections = list(_connections.get(id(obj), ()))
+    by_signal = {}
+    for signal, receiver_id in connections:
+        by_signal.setdefault(signal, []).append(receiver_id)
+    for signal, receiver_ids in by_signal.items():
+        signal.disconnect_many(receiver_ids)
+    return len(connections)
+
+
+def connections(obj):
+    ''' Return the connections of an object or function
+    
+    Args:
+        obj (object): An object whose methods are connected to signals, or
+            a function that is connected to signals.
+            
+    Returns:
+        list: A list of (signal, receiver_id) tuples.
+    '''
+    with _connections_lock:
+        return list(_connections.get(id(obj), ()))
+
+
+def connection_count(obj):
+    ''' Return the number of connections of an object or function
+    
+    Args:
+        obj (object): An object whose methods are connected to signals, or
+            a function that is connected to signals.
+    '''
+    with _connections_lock:
+        return len(_connections.get(id(obj), ()))
+
+
+def _owner(signal, receiver_id):
+    ''' Return the object that owns a connection, or None if it's gone '''
+    ref = signal._receivers.get(receiver_id)
+    if ref is None:
+        return None
+    if receiver_id in signal._strong:
+        return _ref(ref, strong=True)[1]
+    # WeakMethod references the bound object, which is returned when it's
+    # called as a plain weakref.
+    return weakref.ref.__call__(ref)
+
+
+def leak_report(min_connections=100, signals=None):
+    ''' List objects with many connections
     
+    Args:
+        min_connections (int): The minimum number of connections for an
+            object to be included.
+        signals (set): An optional set of signals. Only connections to these
+            signals are counted.
+            
+    Returns:
+        list: A list of (object, count) tuples, with the largest counts 
+        first.
+    '''
+    with _connections_lock:
+        items = [list(c) for c in list(_connections.values())
+                 if len(c) >= min_connections]
+    report = []
+    for conns in items:
+        if signals is not None:
+            conns = [c for c in conns if c[0] in signals]
+            if len(conns) < min_connections:
+                continue
+        obj = _owner(*conns[0])
+        if obj is not None:
+            report.append((obj, len(conns)))
+    report.sort(key=lambda item: -item[1])
+    return report
+
 class Signal():
     ''' A class that can emit and receive data from multiple callables. 
     
@@ -25,6 +366,21 @@ class Signal():
             receiver_limit (int): Limit the number of receivers [optional]
             condition (Condition): An optional signal Condition.
             attrs (dict): Optional dictionary of signal attributes.
+            filter_kwargs (bool): True to emit to each receiver only the
+                key word arguments that it declares in its signature.
+                Receivers that take **kwargs get all of them. Signatures
+                are read once, when receivers are connected. Defaults to
+                False.
+            budget (float): An optional latency budget for each receiver,
+                in seconds. See set_budget.
+            isolate (bool): True to keep calling receivers after one
+                raises an exception. See set_isolation.
+            on_error (callable): An optional function to report isolated
+                exceptions to. See set_isolation.
+            reentry (str): An optional policy for when the signal is
+                emitted again while it's emitting. See set_reentry.
+            max_depth (int): An optional limit on nested emits. See
+                set_reentry.
     '''
     
     def __init__(self,
@@ -32,7 +388,24 @@ class Signal():
                  doc=None,
                  receiver_limit=None,
                  condition=None,
-                 attrs=None):
+                 attrs=None,
+                 filter_kwargs=False,
+                 budget=None,
+                 isolate=False,
+                 on_error=None,
+                 reentry=None,
+                 max_depth=None):
+        self._lock = _SignalLock(self.disconnect)
+        self._filter_kwargs = filter_kwargs
+        self._budget = None
+        self._demote = False
+        self._isolate = isolate
+        self._on_error = on_error
+        self._reentry = None
+        if reentry is not None:
+            self._check_reentry(reentry)
+            self._reentry = reentry
+            self._max_depth = max_depth or sys.maxsize
         self.reset()
         self._name = name
         self._doc = doc
@@ -40,15 +413,28 @@ class Signal():
         self._attrs = attrs
         if condition is not None:
             self.add_condition(condition)
+        if budget is not None:
+            self.set_budget(budget)
     
     def add_condition(self, condition):
         ''' Add a condition that the signal must pass to be received
         
         Args:
-            condition (Condition): A Condition instance
+            condition (Condition): A Condition instance, such as a C
+                predicate.
+                
+        Note:
+            The conditions are compiled into one predicate for each
+            receiver, when the condition is added and when receivers are
+            connected. Receivers connected with equal key word arguments
+            share a predicate, which is checked once per emit for all of
+            them.
         '''
-        self._conditions[condition.name] = condition
-        self.emit = self._conditioned_emit
+        with self._lock:
+            self._conditions[condition.name] = condition
+            self._condition_list = tuple(self._conditions.values())
+            self._recompile()
+            self._set_emit()
         return True
         
     def remove_condition(self, name):
@@ -57,37 +443,243 @@ class Signal():
         Args:
             name (str): The name of the condition to remove.
         '''
-        try:
-            del self._conditions[name]
-        except KeyError:
-            pass
-        if len(self._conditions) == 0:
-            self.emit = self._emit
-    
-    def connect(self, receiver, **receiver_kwargs):
-        ''' Store weakref of receiver function or method to call 
+        with self._lock:
+            try:
+                del self._conditions[name]
+            except KeyError:
+                pass
+            self._condition_list = tuple(self._conditions.values())
+            self._recompile()
+            self._set_emit()
+
+    def _recompile(self):
+        ''' Compile new predicates for all receivers after a condition
+        change. The lock must be held when this is called. '''
+        predicates = {}
+        self._groups = weakref.WeakValueDictionary()
+        self._compile(list(self._receivers), predicates)
+        self._predicates = predicates
+        self._vector_conditions = tuple(
+            [c for c in self._condition_list
+             if getattr(c, 'vectorised', False)])
+        self._vector_columns = None
+
+    def _compile(self, receiver_ids, predicates=None):
+        ''' Compile the conditions into a predicate for each receiver 
+        
+        Receivers with equal receiver_kwargs share a predicate, so they form
+        a group whose conditions are only checked once per emit.
         
+        Args:
+            receiver_ids (list): The receivers to compile predicates for.
+            predicates (dict): The dictionary to add the predicates to.
+                Defaults to the signal's predicates.
+        
+        Note:
+            The lock must be held when this is called.
+        '''
+        conditions = self._condition_list
+        if not conditions:
+            return
+        if predicates is None:
+            predicates = self._predicates
+        groups = self._groups
+        compiled = {}
+        for receiver_id in receiver_ids:
+            rec_kwargs = self._receiver_kwargs[receiver_id]
+            key = _fingerprint(rec_kwargs)
+            if key is None:
+                # Unhashable values - only share the same dictionary
+                key = id(rec_kwargs)
+                cache = compiled
+            else:
+                cache = groups
+            predicate = cache.get(key)
+            if predicate is None:
+                predicate = _condition.compile_conditions(conditions,
+                                                          rec_kwargs)
+                cache[key] = predicate
+            predicates[receiver_id] = predicate
+
+    def _default_emit(self):
+        ''' Return the emit method for the signal's settings '''
+        emit = self._base_emit()
+        if self._reentry is not None:
+            self._inner_emit = emit
+            # The standard emit loop is run by _guarded_emit itself
+            self._inline = getattr(emit, '__func__', None) is Signal._emit
+            return self._guarded_emit
+        return emit
+
+    def _base_emit(self):
+        ''' Return the emit method without reentry checks '''
+        if self._isolate:
+            return self._isolated_emit
+        if self._budget is not None:
+            return self._budgeted_emit
+        if self._condition_list:
+            return self._conditioned_emit
+        if self._filter_kwargs:
+            return self._filtered_emit
+        return self._emit
+    
+    def connect(self, receiver, priority=0, strong=False, **receiver_kwargs):
+        ''' Store weakref of receiver function or method to call
+
         Args:
             receiver (callable): A callable receiver
+            priority (int, float): Receivers with higher priorities are
+                called first. Defaults to 0.
+            strong (bool): True to hold a normal reference to the receiver
+                instead of a weak reference. The receiver then stays
+                connected until it's disconnected, and emits skip the
+                weak reference lookup. Defaults to False.
             kwargs: Optional key word arguments
             
         Returns:
             float: A receiver id that can be used to disconnect
         '''
+        ref, obj = _ref(receiver, strong)
+        keys = _receiver_keys(receiver) if self._filter_kwargs else None
+        with self._lock:
+            receiver_id = self._add(ref, obj, priority, receiver_kwargs,
+                                    strong, keys)
+            self._compile([receiver_id])
+            self._insert(receiver_id)
+        return receiver_id
+
+    def connect_many(self, receivers, priority=0, strong=False,
+                     **receiver_kwargs):
+        ''' Connect several receivers at once
+        
+        Args:
+            receivers (list): A list of callable receivers.
+            priority (int, float): Receivers with higher priorities are
+                called first. Defaults to 0.
+            strong (bool): True to hold normal references to the receivers.
+            kwargs: Optional key word arguments, shared by all receivers.
+            
+        Returns:
+            list: The receiver ids, in the same order as the receivers.
+        '''
+        refs = [_ref(receiver, strong) for receiver in receivers]
+        if self._filter_kwargs:
+            keys = [_receiver_keys(receiver) for receiver in receivers]
+        else:
+            keys = [None] * len(receivers)
+        with self._lock:
+            limit = self._receiver_limit
+            if limit is not None and self.n + len(refs) > limit:
+                raise KeyError('Limit of receivers (or suppliers) reached.')
+            receiver_ids = [self._add(ref, obj, priority, receiver_kwargs,
+                                      strong, k)
+                            for (ref, obj), k in zip(refs, keys)]
+            self._compile(receiver_ids)
+            self._order.extend([(-priority, receiver_id)
+                                for receiver_id in receiver_ids])
+            self._order.sort()
+            self._sort()
+        return receiver_ids
+
+    def _add(self, ref, obj, priority, receiver_kwargs, strong=False,
+             keys=None):
+        ''' Add a receiver, without updating the dispatch order 
+        
+        Note:
+            The lock must be held when this is called.
+        '''
         if self.n == self._receiver_limit:
             raise KeyError('Limit of receivers (or suppliers) reached.')
         receiver_id = self._next_id
-        if hasattr(receiver, '__self__') and hasattr(receiver, '__func__'):
-            ref = weakref.WeakMethod(receiver)
-            obj = receiver.__self__
-        else:
-            ref = weakref.ref(receiver)
-            obj = receiver
+        self._next_id += 1
         self._receivers[receiver_id] = ref
         self._receiver_kwargs[receiver_id] = receiver_kwargs
-        weakref.finalize(obj, self.disconnect, receiver_id)
-        self._next_id += 1
+        self._priorities[receiver_id] = priority
+        if self._filter_kwargs:
+            self._keys[receiver_id] = keys
+        if strong:
+            self._strong.add(receiver_id)
+        else:
+            self._finalizers[receiver_id] = weakref.finalize(
+                obj, self._collected, receiver_id)
+        key = id(obj)
+        self._owners[receiver_id] = key
+        with _connections_lock:
+            try:
+                _connections[key].add((self, receiver_id))
+            except KeyError:
+                _connections[key] = {(self, receiver_id)}
         return receiver_id
+
+    def _collected(self, receiver_id):
+        ''' Disconnect a receiver whose object was garbage collected '''
+        with self._lock as lock:
+            if lock.depth > 1:
+                lock.collected.append(receiver_id) # Mid update
+            else:
+                self.disconnect(receiver_id)
+
+    def _discard(self, receiver_id):
+        ''' Remove a receiver, without updating the dispatch order 
+        
+        Note:
+            The lock must be held when this is called.
+        '''
+        del self._receivers[receiver_id]
+        del self._receiver_kwargs[receiver_id]
+        self._keys.pop(receiver_id, None)
+        self._frozen.pop(receiver_id, None)
+        self._predicates.pop(receiver_id, None)
+        self._overruns.pop(receiver_id, None)
+        self._demoted.discard(receiver_id)
+        finalizer = self._finalizers.pop(receiver_id, None)
+        if finalizer is None:
+            self._strong.discard(receiver_id)
+        else:
+            finalizer.detach()
+        key = self._owners.pop(receiver_id)
+        with _connections_lock:
+            connections = _connections.get(key)
+            if connections is not None:
+                connections.discard((self, receiver_id))
+                if not connections:
+                    _connections.pop(key, None)
+
+    def _entry(self, receiver_id):
+        ''' Return the dispatch tuple entry for a receiver 
+        
+        Entries are (receiver_id, ref, weak) tuples. The ref is a weak
+        reference if weak is True, and the receiver itself otherwise.
+        '''
+        receiver = self._frozen.get(receiver_id)
+        if receiver is not None:
+            return (receiver_id, receiver, False)
+        return (receiver_id, self._receivers[receiver_id],
+                receiver_id not in self._strong)
+
+    def _sort(self):
+        ''' Precompute the order that receivers are called in 
+        
+        Note:
+            The lock must be held when this is called.
+        '''
+        self._dispatch = tuple([self._entry(receiver_id)
+                                for p, receiver_id in self._order])
+
+    def _insert(self, receiver_id):
+        ''' Add a new receiver to the precomputed order '''
+        key = (-self._priorities[receiver_id], receiver_id)
+        i = bisect.bisect_left(self._order, key)
+        self._order.insert(i, key)
+        d = self._dispatch
+        self._dispatch = d[:i] + (self._entry(receiver_id),) + d[i:]
+
+    def _remove(self, receiver_id, priority):
+        ''' Remove a receiver from the precomputed order '''
+        i = bisect.bisect_left(self._order, (-priority, receiver_id))
+        del self._order[i]
+        d = self._dispatch
+        self._dispatch = d[:i] + d[i + 1:]
     
     @property
     def n(self):
@@ -120,11 +712,31 @@ class Signal():
         Args:
             receiver_id (int): The id of the receiver.
         '''
-        try:
-            del self._receivers[receiver_id]
-            del self._receiver_kwargs[receiver_id]
-        except KeyError:
-            pass
+        with self._lock:
+            try:
+                priority = self._priorities.pop(receiver_id)
+            except KeyError:
+                return True
+            self._remove(receiver_id, priority)
+            self._discard(receiver_id)
+        return True
+
+    def disconnect_many(self, receiver_ids):
+        ''' Disconnect several receivers at once
+        
+        Args:
+            receiver_ids (list): The ids of the receivers.
+        '''
+        with self._lock:
+            removed = set()
+            for receiver_id in receiver_ids:
+                if self._priorities.pop(receiver_id, None) is not None:
+                    self._discard(receiver_id)
+                    removed.add(receiver_id)
+            if removed:
+                self._order = [key for key in self._order
+                               if key[1] not in removed]
+                self._sort()
         return True
 
     def _emit(self, **kwargs):
@@ -135,38 +747,506 @@ class Signal():
         
         Note: The 'emit' method is set to this method normally.
         '''
-        for receiver_id, ref in self._receivers.items():
-            receiver = ref()
-            receiver(**kwargs)
-            
+        for receiver_id, ref, weak in self._dispatch:
+            receiver = ref() if weak else ref
+            if receiver is not None and receiver(**kwargs) is STOP:
+                break
+
+    def _filtered_emit(self, **kwargs):
+        ''' An emit method that filters key word arguments for receivers
+
+        Args:
+            **kwargs: Key word arguments.
+        
+        Note: The 'emit' method is set to this method when filter_kwargs
+        is True.
+        '''
+        keys = self._keys
+        emitted = kwargs.keys()
+        last = covered = None
+        for receiver_id, ref, weak in self._dispatch:
+            receiver = ref() if weak else ref
+            names = keys.get(receiver_id, False)
+            if receiver is None or names is False:
+                continue # Gone or disconnected during this emit
+            if names is not last:
+                # Receivers of the same function share their names
+                last = names
+                covered = names is None or emitted <= names
+            if covered:
+                ret = receiver(**kwargs) # Nothing to filter out
+            else:
+                ret = receiver(**{k: kwargs[k] for k in names if k in kwargs})
+            if ret is STOP:
+                break
+
     def _conditioned_emit(self, **kwargs):
-        ''' A conditioned emit method 
+        ''' A conditioned emit method
+
+        Args:
+            **kwargs: Key word arguments.
+        '''
+        predicates = self._predicates
+        keys = self._keys
+        results = {}
+        dispatch = self._dispatch
+        if self._vector_conditions:
+            dispatch = self._select(dispatch, kwargs)
+        for receiver_id, ref, weak in dispatch:
+            predicate = predicates.get(receiver_id)
+            if predicate is None:
+                continue # Disconnected during this emit
+            passed = results.get(predicate)
+            if passed is None:
+                passed = results[predicate] = predicate(kwargs)
+            if not passed:
+                continue
+            receiver = ref() if weak else ref
+            if receiver is None:
+                continue
+            names = keys.get(receiver_id)
+            if names is not None and not kwargs.keys() <= names:
+                ret = receiver(**{k: kwargs[k] for k in names if k in kwargs})
+            else:
+                ret = receiver(**kwargs)
+            if ret is STOP:
+                break
+
+    def _select(self, dispatch, kwargs):
+        ''' Return the dispatch entries that pass the vectorised conditions
+
+        The receiver key word arguments are stored in columns for each
+        vectorised condition, which are rebuilt when the receivers change.
+        '''
+        columns = self._vector_columns
+        if columns is None or columns[0] is not dispatch:
+            with self._lock:
+                dispatch = self._dispatch
+                conditions = self._vector_conditions
+                receiver_kwargs = self._receiver_kwargs
+                kwargs_list = [receiver_kwargs.get(receiver_id, {})
+                               for receiver_id, ref, weak in dispatch]
+                columns = (dispatch, conditions,
+                           [c.columns(kwargs_list) for c in conditions])
+                self._vector_columns = columns
+        dispatch, conditions, states = columns
+        mask = None
+        for condition, state in zip(conditions, states):
+            m = condition.mask(state, kwargs)
+            mask = m if mask is None else mask & m
+        return [dispatch[i] for i in mask.nonzero()[0].tolist()]
+
+    def set_budget(self, budget, demote=False):
+        ''' Set a latency budget for each receiver
         
+        Args:
+            budget (float): The time in seconds that each receiver may take.
+                None removes the budget.
+            demote (bool): True to call receivers that have exceeded the
+                budget from a background thread in later emits, so that
+                they no longer delay the emit. Defaults to False.
+                
+        Note:
+            Emits time each receiver while there is a budget. Receivers
+            that exceed it are logged with their qualified name and their
+            overrun statistics, on their 1st, 2nd, 4th, 8th, ... overrun.
+            Setting the budget clears the statistics and promotes any
+            demoted receivers. Demoted receivers can't stop an emit with
+            STOP. Their calls are dropped if the background queue is full.
+        '''
+        with self._lock:
+            self._budget = budget
+            self._demote = demote
+            self._overruns = {}
+            self._demoted = set()
+            self._set_emit()
+
+    def _set_emit(self):
+        ''' Use the emit method for the signal's settings, unless muted '''
+        if hasattr(self, '_prev_emit'):
+            self._prev_emit = self._default_emit()
+        else:
+            self.emit = self._default_emit()
+
+    @property
+    def budget(self):
+        ''' The latency budget for each receiver, in seconds, or None '''
+        return self._budget
+
+    def overruns(self):
+        ''' Return statistics for receivers that have exceeded the budget
+        
+        Returns:
+            dict: A dictionary for each receiver id. It has the receiver's
+            qualified 'name', the 'count' of overruns, the 'total' and
+            'worst' times in seconds that it took over the budget, whether
+            it is 'demoted', and the number of demoted calls 'dropped'.
+        '''
+        with self._lock:
+            return {receiver_id: dict(stats)
+                    for receiver_id, stats in self._overruns.items()}
+
+    def _overrun(self, receiver_id, receiver, elapsed):
+        ''' Record and log a receiver that exceeded the budget '''
+        excess = elapsed - self._budget
+        with self._lock:
+            stats = self._overruns.get(receiver_id)
+            if stats is None:
+                if receiver_id not in self._receivers:
+                    return # Disconnected during this emit
+                stats = {'name': _qualname(receiver), 'count': 0,
+                         'total': 0.0, 'worst': 0.0, 'demoted': False,
+                         'dropped': 0}
+                self._overruns[receiver_id] = stats
+            stats['count'] += 1
+            stats['total'] += excess
+            stats['worst'] = max(stats['worst'], excess)
+            count = stats['count']
+            if self._demote and not stats['demoted']:
+                stats['demoted'] = True
+                self._demoted.add(receiver_id)
+        if count & (count - 1) == 0:
+            _logger().warning(
+                'Receiver %s of signal "%s" took %.3g ms, which is %.3g ms '
+                'over budget. It has overrun %d times, by %.3g ms in total.%s',
+                stats['name'], self.name, elapsed * 1e3, excess * 1e3, count,
+                stats['total'] * 1e3,
+                ' It is demoted.' if stats['demoted'] else '')
+
+    def _budgeted_emit(self, **kwargs):
+        ''' An emit method that times receivers against the budget
+
         Args:
             **kwargs: Key word arguments.
+        
+        Note: The 'emit' method is set to this method when there is a
+        budget. It also applies conditions and filters key word arguments.
+        '''
+        dispatch = self._dispatch
+        if self._vector_conditions:
+            dispatch = self._select(dispatch, kwargs)
+        self._deliver_budgeted(dispatch, kwargs, {})
+
+    def _deliver_budgeted(self, entries, kwargs, results):
+        ''' Call receivers from dispatch entries, timing them '''
+        budget = self._budget
+        demoted = self._demoted
+        keys = self._keys
+        predicates = self._predicates if self._condition_list else None
+        clock = time.perf_counter
+        for receiver_id, ref, weak in entries:
+            if predicates is not None:
+                predicate = predicates.get(receiver_id)
+                if predicate is None:
+                    continue # Disconnected during this emit
+                passed = results.get(predicate)
+                if passed is None:
+                    passed = results[predicate] = predicate(kwargs)
+                if not passed:
+                    continue
+            receiver = ref() if weak else ref
+            if receiver is None:
+                continue
+            names = keys.get(receiver_id)
+            if names is not None and not kwargs.keys() <= names:
+                call_kwargs = {k: kwargs[k] for k in names if k in kwargs}
+            else:
+                call_kwargs = kwargs
+            if receiver_id in demoted:
+                if not _defer(receiver, call_kwargs):
+                    with self._lock:
+                        stats = self._overruns.get(receiver_id)
+                        if stats is not None:
+                            stats['dropped'] += 1
+                continue
+            t0 = clock()
+            ret = receiver(**call_kwargs)
+            elapsed = clock() - t0
+            if elapsed > budget:
+                self._overrun(receiver_id, receiver, elapsed)
+            if ret is STOP:
+                break
+
+    def set_isolation(self, isolate=True, on_error=None):
+        ''' Keep calling receivers after one raises an exception
+        
+        Args:
+            isolate (bool): True to isolate receivers from each other's
+                exceptions. Defaults to True.
+            on_error (callable): An optional function that is called as
+                on_error(signal, exceptions) after an emit in which
+                receivers raised exceptions. Without it, the emit raises an
+                EmitError that contains them.
+        
+        Note:
+            Only Exception subclasses are caught. Conditions and budgets
+            still apply to isolated emits.
         '''
-        for receiver_id, ref in self._receivers.items():
-            condition_pass = True
-            for condition_name, condition in self._conditions.items():
-                rec_kwargs = self._receiver_kwargs[receiver_id]
-                all_kwargs = {**rec_kwargs, **kwargs}
-                condition_pass &= condition.check(**all_kwargs)
-            if condition_pass:
-                self._emit(**kwargs)
+        with self._lock:
+            self._isolate = isolate
+            self._on_error = on_error
+            self._set_emit()
+
+    def _isolated_emit(self, **kwargs):
+        ''' An emit method that calls every receiver, even if some raise
+
+        Args:
+            **kwargs: Key word arguments.
+        
+        Note: The 'emit' method is set to this method when isolation is
+        on. The dispatch entries are shared by an iterator, so after an
+        exception delivery resumes with the next receiver. The try block
+        is only entered once for each exception, not for each receiver.
+        '''
+        dispatch = self._dispatch
+        errors = None
+        if not (self._condition_list or self._keys or
+                self._budget is not None):
+            entries = iter(dispatch)
+            while True:
+                try:
+                    for receiver_id, ref, weak in entries:
+                        receiver = ref() if weak else ref
+                        if (receiver is not None
+                                and receiver(**kwargs) is STOP):
+                            break
+                    break
+                except Exception as e:
+                    if errors is None:
+                        errors = []
+                    errors.append(e)
+        else:
+            if self._vector_conditions:
+                dispatch = self._select(dispatch, kwargs)
+            entries = iter(dispatch)
+            if self._budget is not None:
+                deliver = self._deliver_budgeted
+            else:
+                deliver = self._deliver
+            results = {}
+            while True:
+                try:
+                    deliver(entries, kwargs, results)
+                    break
+                except Exception as e:
+                    if errors is None:
+                        errors = []
+                    errors.append(e)
+        if errors is not None:
+            if self._on_error is not None:
+                self._on_error(self, errors)
+            else:
+                raise EmitError('Receivers of signal "' + str(self.name) +
+                                '" raised ' + str(len(errors)) +
+                                ' exception(s).', errors)
+
+    def _deliver(self, entries, kwargs, results):
+        ''' Call receivers from dispatch entries, applying conditions and
+        filtering key word arguments '''
+        keys = self._keys
+        predicates = self._predicates if self._condition_list else None
+        for receiver_id, ref, weak in entries:
+            if predicates is not None:
+                predicate = predicates.get(receiver_id)
+                if predicate is None:
+                    continue # Disconnected during this emit
+                passed = results.get(predicate)
+                if passed is None:
+                    passed = results[predicate] = predicate(kwargs)
+                if not passed:
+                    continue
+            receiver = ref() if weak else ref
+            if receiver is None:
+                continue
+            names = keys.get(receiver_id)
+            if names is not None and not kwargs.keys() <= names:
+                ret = receiver(**{k: kwargs[k] for k in names if k in kwargs})
+            else:
+                ret = receiver(**kwargs)
+            if ret is STOP:
+                break
+
+    @staticmethod
+    def _check_reentry(policy):
+        if policy not in (None, 'raise', 'skip', 'defer'):
+            raise ValueError('reentry must be None, "raise", "skip" or '
+                             '"defer".')
+
+    def set_reentry(self, policy='raise', max_depth=None):
+        ''' Check for the signal being emitted while it's emitting
+        
+        Args:
+            policy (str): What to do with an emit of the signal from one of
+                its own receivers (directly, or through other signals), or
+                with an emit that's nested more than max_depth deep. 'raise'
+                raises a ReentryError, 'skip' ignores the emit, and 'defer'
+                delivers it after the outermost emit finishes. None removes
+                the checks. Defaults to 'raise'.
+            max_depth (int): An optional limit on the number of checked
+                signals emitting at once, including this one.
+        
+        Note:
+            Emits are tracked for each thread and asyncio task, so other
+            threads can emit the signal at the same time. Only signals with
+            a policy are tracked. A feedback loop that re-emits on every
+            deferred emit keeps going, so defer suits loops that settle.
+        '''
+        self._check_reentry(policy)
+        with self._lock:
+            self._reentry = policy
+            self._max_depth = max_depth or sys.maxsize
+            self._set_emit()
+
+    def _guarded_emit(self, **kwargs):
+        ''' An emit method that checks for reentry
+
+        Args:
+            **kwargs: Key word arguments.
+        
+        Note: The 'emit' method is set to this method when there is a
+        reentry policy. It calls the emit method for the other settings.
+        '''
+        active = _emitting.get()
+        if active and (self in active or len(active) >= self._max_depth):
+            self._reenter(active, kwargs)
+            return
+        token = _emitting.set(active + (self,))
+        try:
+            if self._inline:
+                for receiver_id, ref, weak in self._dispatch:
+                    receiver = ref() if weak else ref
+                    if receiver is not None and receiver(**kwargs) is STOP:
+                        break
+            else:
+                self._inner_emit(**kwargs)
+        except BaseException:
+            if not active:
+                pending = _pending.get()
+                if pending:
+                    pending.clear() # Don't deliver them in a later emit
+            raise
+        finally:
+            _emitting.reset(token)
+        if not active:
+            pending = _pending.get()
+            if pending:
+                _run_pending(pending)
+
+    def _reenter(self, active, kwargs):
+        ''' Apply the reentry policy '''
+        policy = self._reentry
+        if policy == 'defer':
+            pending = _pending.get()
+            if pending is None:
+                pending = []
+                _pending.set(pending)
+            pending.append((self, kwargs))
+            return
+        path = ' -> '.join([str(s.name) for s in active + (self,)])
+        if self in active:
+            message = ('Signal "' + str(self.name) + '" was emitted while '
+                       'it was emitting: ' + path)
+        else:
+            message = ('Emits were nested more than ' + str(self._max_depth) +
+                       ' deep: ' + path)
+        if policy == 'raise':
+            raise ReentryError(message)
+        _logger().debug('Skipped an emit. %s', message)
 
     def _muted(self, **kwargs):
         pass
             
+    def memory_report(self):
+        ''' Report the number and approximate size of the signal's parts
+        
+        Returns:
+            dict: A dictionary with keys 'signals', 'receivers',
+            'receiver_kwargs', 'conditions' and 'finalizers'. Each value is
+            a dictionary with a 'count' and approximate 'bytes'.
+            
+        Note:
+            Sizes are shallow, from sys.getsizeof, so objects that receivers
+            and conditions refer to are not included. Only finalizers that
+            are still pending are counted.
+        '''
+        getsizeof = sys.getsizeof
+        with self._lock:
+            parts = [self.__dict__, self._receivers, self._receiver_kwargs,
+                     self._priorities, self._finalizers, self._owners,
+                     self._strong, self._keys, self._frozen, self._order,
+                     self._dispatch, self._conditions, self._condition_list,
+                     self._predicates]
+            refs = list(self._receivers.values())
+            kwargs = [kw for kw in self._receiver_kwargs.values() if kw]
+            conditions = list(self._conditions.values())
+            finalizers = [f for f in self._finalizers.values() if f.alive]
+            entries = self._dispatch
+        return {
+            'signals': {'count': 1,
+                        'bytes': getsizeof(self) + sum(map(getsizeof, parts))},
+            'receivers': {'count': len(refs),
+                          'bytes': sum(map(getsizeof, refs))
+                          + sum(map(getsizeof, entries))},
+            'receiver_kwargs': {'count': len(kwargs),
+                                'bytes': sum(map(getsizeof, kwargs))},
+            'conditions': {'count': len(conditions),
+                           'bytes': sum(map(getsizeof, conditions))},
+            'finalizers': {'count': len(finalizers),
+                           'bytes': sum(map(getsizeof, finalizers))}}
+
+    def freeze(self):
+        ''' Hold strong references to the receivers that are connected now 
+        
+        Emits then call these receivers directly rather than through their
+        weak references. This is useful before forking worker processes,
+        as emits in the workers no longer touch the weak references.
+        
+        Note:
+            Frozen receivers are kept alive until they are disconnected, or
+            the signal is unfrozen. Receivers connected later are not frozen.
+        '''
+        with self._lock:
+            for receiver_id, ref in self._receivers.items():
+                if receiver_id in self._strong:
+                    continue
+                receiver = ref()
+                if receiver is not None:
+                    self._frozen[receiver_id] = receiver
+            self._sort()
+            
+    def unfreeze(self):
+        ''' Go back to weak references for frozen receivers '''
+        with self._lock:
+            self._frozen = {}
+            self._sort()
+
     def mute(self):
         ''' Prevent receivers from receiving signals '''
-        self._prev_emit = self.emit
-        self.emit = self._muted
+        with self._lock:
+            self._prev_emit = self.emit
+            self.emit = self._muted
 
     def unmute(self):
         ''' Allow receivers to receive signals (after a mute) '''
-        self.emit = self._prev_emit
-        del self._prev_emit
+        with self._lock:
+            self.emit = self._prev_emit
+            del self._prev_emit
     
+    def _suppliers(self, kwargs):
+        ''' Yield each supplier with the key word arguments to call it with
+
+        The key word arguments are filtered for each supplier when the
+        signal has filter_kwargs set, as they are for emits.
+        '''
+        keys = self._keys
+        for receiver_id, ref, weak in self._dispatch:
+            receiver = ref() if weak else ref
+            names = keys.get(receiver_id)
+            if names is None or kwargs.keys() <= names:
+                yield receiver, kwargs
+            else:
+                yield receiver, {k: kwargs[k] for k in names if k in kwargs}
+
     def fetch(self, **kwargs):
         ''' Get a return value from a single supplier 
         
@@ -177,9 +1257,8 @@ class Signal():
             raise KeyError('Signal must be set to have only 1 supplier.')
         if self.n == 0:
             raise KeyError('No suppliers')
-        for receiver_id, ref in self._receivers.items():
-            receiver = ref()
-            return receiver(**kwargs)
+        for receiver, call_kwargs in self._suppliers(kwargs):
+            return receiver(**call_kwargs)
 
     def fetch_all(self, **kwargs):
         ''' Get return value from all connected callables 
@@ -193,23 +1272,108 @@ class Signal():
         if self.n == 0:
             raise KeyError('No suppliers')
         ret = []
-        for receiver_id, ref in self._receivers.items():
-            receiver = ref()
-            ret.append(receiver(**kwargs))
+        for receiver, call_kwargs in self._suppliers(kwargs):
+            ret.append(receiver(**call_kwargs))
         return ret
 
+    def fetch_iter(self, **kwargs):
+        ''' Lazily yield return values from connected callables 
+        
+        Suppliers are only called as the iterator is advanced, so consumers
+        can stop early without calling the remaining suppliers.
+        
+        Args:
+            **kwargs: Key word arguments.
+            
+        Yields:
+            The return value of each supplier, in receiver order.
+        '''
+        for receiver, call_kwargs in self._suppliers(kwargs):
+            yield receiver(**call_kwargs)
+
+    def fetch_first(self, default=None, **kwargs):
+        ''' Get the first return value that is not None 
+        
+        Suppliers after the first one to return a value are not called.
+        
+        Args:
+            default: The value returned if no supplier returns a value.
+            **kwargs: Key word arguments.
+        '''
+        for receiver, call_kwargs in self._suppliers(kwargs):
+            ret = receiver(**call_kwargs)
+            if ret is not None:
+                return ret
+        return default
+
+    def fetch_any(self, **kwargs):
+        ''' Return True if any supplier returns a truthy value 
+        
+        Suppliers after the first truthy return value are not called.
+        
+        Args:
+            **kwargs: Key word arguments.
+        '''
+        for receiver, call_kwargs in self._suppliers(kwargs):
+            if receiver(**call_kwargs):
+                return True
+        return False
+
+    def fetch_reduce(self, fn, init, until=None, **kwargs):
+        ''' Reduce return values from suppliers into a single value 
+        
+        Args:
+            fn (callable): A function taking the accumulated value and the
+                next return value, and returning the new accumulated value.
+            init: The initial accumulated value.
+            until (callable): An optional function taking the accumulated
+                value. When it returns True, no more suppliers are called.
+            **kwargs: Key word arguments.
+            
+        Returns:
+            The accumulated value.
+        '''
+        acc = init
+        if until is not None and until(acc):
+            return acc
+        for receiver, call_kwargs in self._suppliers(kwargs):
+            acc = fn(acc, receiver(**call_kwargs))
+            if until is not None and until(acc):
+                break
+        return acc
+
     def reset(self):
         ''' Reset the signal '''
-        self._receivers = {}
-        self._receiver_kwargs = {}
-        self._next_id = 0
-        self._conditions = {}
-        self.emit = self._emit
+        with self._lock:
+            for receiver_id in list(getattr(self, '_owners', ())):
+                self._discard(receiver_id)
+            self._receivers = {}
+            self._receiver_kwargs = {}
+            self._priorities = {}
+            self._finalizers = {}
+            self._strong = set()
+            self._frozen = {}
+            self._keys = {}
+            self._owners = {}
+            self._order = []
+            self._dispatch = ()
+            self._next_id = 0
+            self._conditions = {}
+            self._condition_list = ()
+            self._predicates = {}
+            self._groups = weakref.WeakValueDictionary()
+            self._vector_conditions = ()
+            self._vector_columns = None
+            self._overruns = {}
+            self._demoted = set()
+            if hasattr(self, '_prev_emit'):
+                del self._prev_emit # Reset unmutes the signal
+            self.emit = self._default_emit()
         
     def receivers(self):
         receivers = []
-        for receiver_id, ref in self._receivers.items():
-            receiver = ref()
+        for receiver_id, ref, weak in self._dispatch:
+            receiver = ref() if weak else ref
             receivers.append(receiver)
         return receivers
 
@@ -217,8 +1381,8 @@ class Signal():
 class SignalContainer(container.Container):
     ''' A dictionary-like collection of Signal instances '''
     
-    def __init__(self, cid=None):
-        super().__init__(signal_cls=Signal, cid=cid)
+    def __init__(self, cid=None, handles=None):
+        super().__init__(signal_cls=Signal, cid=cid, handles=handles)
         
     def signal(self, name=None, doc=None, attrs=None, **kwargs):    
         ''' Create or get a new signal instance
@@ -247,19 +1411,71 @@ class SignalBox(box.Box):
         '''
         return self.get(name=name, doc=doc, attrs=attrs, **kwargs)
     
+    def _signal_set(self):
+        return {s for c in list(self._cs.values()) for s in list(c.values())}
+    
+    def connections(self, obj):
+        ''' Return the connections of an object to signals in this box
+        
+        Args:
+            obj (object): An object whose methods are connected to signals,
+                or a function that is connected to signals.
+            
+        Returns:
+            list: A list of (signal, receiver_id) tuples.
+        '''
+        signals = self._signal_set()
+        return [c for c in connections(obj) if c[0] in signals]
+    
+    def leak_report(self, min_connections=100):
+        ''' List objects with many connections to signals in this box
+        
+        Args:
+            min_connections (int): The minimum number of connections for an
+                object to be included.
+            
+        Returns:
+            list: A list of (object, count) tuples, with the largest counts 
+            first.
+        '''
+        return leak_report(min_connections, signals=self._signal_set())
+    
     
 signal_boxes = {}
+_signal_boxes_lock = threading.Lock()
 
 def signal_box(name):
-    if name not in signal_boxes:
-        signal_boxes[name] = SignalBox()
-    return signal_boxes[name]
+    try:
+        return signal_boxes[name]
+    except KeyError:
+        pass
+    with _signal_boxes_lock:
+        if name not in signal_boxes:
+            signal_boxes[name] = SignalBox()
+        return signal_boxes[name]
 
 def signal_container(name):
     box = signal_box('default')
     return box.get_container(name)
 
-default_signal_box = signal_box('default')
-default_signal_container = signal_container('default')
-signal = default_signal_container.signal
-get_signal_box = signal_box
\ No newline at end of file
+def signal(name=None, doc=None, attrs=None, **kwargs):
+    ''' Create or get a new signal instance in the default container
+    
+    Args:
+        name (str): A name of the wire/signal [optional]
+        doc (str): A documentation string for the wire/signal [optional]
+        attrs (dict): Optional diction of signal attributes.
+    '''
+    return signal_container('default').signal(name=name, doc=doc,
+                                               attrs=attrs, **kwargs)
+
+get_signal_box = signal_box
+
+def __getattr__(name):
+    # The default box and container are only created when they're first
+    # used, to keep importing fast.
+    if name == 'default_signal_box':
+        return signal_box('default')
+    if name == 'default_signal_container':
+        return signal_container('default')
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
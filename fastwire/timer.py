@@ -0,0 +1,265 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 15:41:26 2026
+
+@author: Reuben
+
+The timer module emits signals after a delay, or periodically. A
+TimerService keeps its timers in a heap ordered by due time and runs them
+all from a single thread, or from an asyncio event loop, rather than using a
+thread per timer. Scheduling a timer is O(log n). Cancelling one only marks
+it, and cancelled timers are dropped when they reach the top of the heap (or
+all at once, when they make up more than half of it).
+
+"""
+
+import heapq
+import itertools
+import logging
+import threading
+import time
+
+from .decorate import ensure_signal_obj
+
+logger = logging.getLogger(__name__)
+
+
+class Timer():
+    ''' A handle for a scheduled emit, which can be used to cancel it
+
+    Args:
+        service (TimerService): The service that runs the timer.
+        signal (Signal): The signal to emit.
+        when (float): The time.monotonic time that the timer is due.
+        interval (float): The period for periodic timers, or None.
+        kwargs (dict): The key word arguments to emit.
+    '''
+
+    def __init__(self, service, signal, when, interval, kwargs):
+        self._service = service
+        self.signal = signal
+        self.when = when
+        self.interval = interval
+        self.kwargs = kwargs
+        self.cancelled = False
+        self.done = False
+        self._handle = None
+
+    def cancel(self):
+        ''' Stop the timer from emitting again '''
+        self._service.cancel(self)
+
+    @property
+    def active(self):
+        ''' True if the timer will emit again '''
+        return not (self.cancelled or self.done)
+
+
+class TimerService():
+    ''' Emit signals in a box after a delay or periodically
+
+    Args:
+        box (SignalBox): The box used to get signals given by name. Signals
+            given by name come from the box's active container when they
+            are scheduled. Signal instances can also be scheduled.
+        loop (asyncio.AbstractEventLoop): An optional event loop to run the
+            timers in. By default, timers run in a background thread.
+
+    Note:
+        When a loop is given, timers should be scheduled and cancelled from
+        the loop's thread. Receivers are called from the timer thread (or
+        loop), and exceptions they raise are logged.
+    '''
+
+    def __init__(self, box, loop=None):
+        self._box = box
+        self._loop = loop
+        self._loop_timers = set()
+        self._heap = []
+        self._seq = itertools.count()
+        self._n_cancelled = 0
+        self._cond = threading.Condition()
+        self._thread = None
+        self._running = False
+        if loop is None:
+            self.start()
+
+    def after(self, delay, signal, **kwargs):
+        ''' Emit a signal once after a delay
+
+        Args:
+            delay (float): The delay in seconds.
+            signal (Signal, str): The signal, or its name in the box.
+            **kwargs: Key word arguments to emit.
+
+        Returns:
+            Timer: A handle that can cancel the timer.
+
+        Raises:
+            ValueError: If the delay is negative.
+        '''
+        return self._schedule(delay, None, signal, kwargs)
+
+    def every(self, interval, signal, delay=None, **kwargs):
+        ''' Emit a signal periodically
+
+        Args:
+            interval (float): The period in seconds.
+            signal (Signal, str): The signal, or its name in the box.
+            delay (float): The delay before the first emit. Defaults to the
+                interval.
+            **kwargs: Key word arguments to emit.
+
+        Returns:
+            Timer: A handle that can cancel the timer.
+
+        Raises:
+            ValueError: If the interval isn't positive, or the delay is
+                negative.
+
+        Note:
+            Emits are due at multiples of the interval after the first one.
+            If the service falls behind, missed emits are skipped.
+        '''
+        if not interval > 0:
+            raise ValueError('interval must be positive.')
+        delay = interval if delay is None else delay
+        return self._schedule(delay, interval, signal, kwargs)
+
+    def _schedule(self, delay, interval, signal, kwargs):
+        if not delay >= 0:
+            raise ValueError('delay must not be negative.')
+        signal = ensure_signal_obj(signal, self._box, None)
+        timer = Timer(self, signal, time.monotonic() + delay, interval,
+                      kwargs)
+        if self._loop is not None:
+            timer._handle = self._loop.call_later(delay, self._fire, timer)
+            self._loop_timers.add(timer)
+            return timer
+        with self._cond:
+            heap = self._heap
+            heapq.heappush(heap, (timer.when, next(self._seq), timer))
+            if heap[0][2] is timer:
+                self._cond.notify() # The next due time is earlier now
+        return timer
+
+    def cancel(self, timer):
+        ''' Cancel a timer
+
+        Args:
+            timer (Timer): The timer to cancel.
+        '''
+        if self._loop is not None:
+            if timer.active:
+                timer.cancelled = True
+                timer._handle.cancel()
+                self._loop_timers.discard(timer)
+            return
+        with self._cond:
+            if not timer.active:
+                return
+            timer.cancelled = True
+            self._n_cancelled += 1
+            heap = self._heap
+            if self._n_cancelled > len(heap) // 2:
+                self._heap = [e for e in heap if not e[2].cancelled]
+                heapq.heapify(self._heap)
+                self._n_cancelled = 0
+
+    def _emit(self, timer):
+        try:
+            timer.signal.emit(**timer.kwargs)
+        except Exception:
+            logger.exception('Timer emit of signal "%s" failed.',
+                             timer.signal.name)
+
+    def _next_time(self, timer, now):
+        interval = timer.interval
+        when = timer.when + interval
+        if when < now:
+            when += ((now - when) // interval + 1) * interval # Skip missed
+        return when
+
+    def _fire(self, timer):
+        ''' Emit a timer in an event loop '''
+        if timer.cancelled:
+            return
+        if timer.interval is None:
+            timer.done = True
+            self._loop_timers.discard(timer)
+        else:
+            timer.when = self._next_time(timer, time.monotonic())
+            delay = timer.when - time.monotonic()
+            timer._handle = self._loop.call_later(delay, self._fire, timer)
+        self._emit(timer)
+
+    def _run(self):
+        cond = self._cond
+        with cond:
+            try:
+                self._run_timers()
+            finally:
+                self._running = False # So that start() can restart it
+
+    def _run_timers(self):
+        ''' Run timers as they come due. The condition must be held. '''
+        cond = self._cond
+        while self._running:
+            heap = self._heap
+            if not heap:
+                cond.wait()
+                continue
+            when, seq, timer = heap[0]
+            if timer.cancelled:
+                heapq.heappop(heap)
+                self._n_cancelled -= 1
+                continue
+            now = time.monotonic()
+            if when > now:
+                cond.wait(when - now)
+                continue
+            if timer.interval is None:
+                heapq.heappop(heap)
+                timer.done = True
+            else:
+                try:
+                    timer.when = self._next_time(timer, now)
+                except Exception:
+                    logger.exception('Timer for signal "%s" could not be '
+                                     'rescheduled.', timer.signal.name)
+                    heapq.heappop(heap)
+                    timer.done = True
+                    continue
+                heapq.heapreplace(heap, (timer.when, next(self._seq),
+                                         timer))
+            cond.release()
+            try:
+                self._emit(timer)
+            finally:
+                cond.acquire()
+
+    @property
+    def pending(self):
+        ''' The number of active timers '''
+        if self._loop is not None:
+            return len(self._loop_timers)
+        with self._cond:
+            return len(self._heap) - self._n_cancelled
+
+    def start(self):
+        ''' Start the timer thread, if it's not running '''
+        with self._cond:
+            if self._running:
+                return
+            self._running = True
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        ''' Stop the timer thread. Pending timers are kept. '''
+        with self._cond:
+            self._running = False
+            self._cond.notify()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
@@ -0,0 +1,167 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 14:05:12 2026
+
+@author: Reuben
+
+The topology module saves the wiring of a SignalBox - its containers, their
+signals, and the functions connected to them - so that it can be rebuilt
+quickly in a later process. Functions are saved by their qualified names
+('module:qualname') and imported again when the topology is loaded. Each
+signal's receivers are then connected in bulk. Because the receivers can be
+imported by name, they live as long as their modules, so they are connected
+with strong references, which skips creating a finalizer for each one.
+
+Only receivers that can be found again by name are saved. Bound methods,
+lambdas and nested functions are skipped; methods decorated in Wired classes
+are connected again when their instances are created.
+
+"""
+
+import importlib
+import json
+
+VERSION = 1
+
+
+def _qualified_name(receiver):
+    ''' Return 'module:qualname' for a receiver, or None if it has none '''
+    module = getattr(receiver, '__module__', None)
+    qualname = getattr(receiver, '__qualname__', None)
+    if module is None or qualname is None or '<' in qualname:
+        return None
+    name = module + ':' + qualname
+    try:
+        if _resolve(name, {}) is not receiver:
+            return None
+    except (ImportError, AttributeError):
+        return None
+    return name
+
+
+def _resolve(name, cache):
+    ''' Import the object given by a 'module:qualname' string '''
+    try:
+        return cache[name]
+    except KeyError:
+        pass
+    module, qualname = name.split(':')
+    obj = importlib.import_module(module)
+    for attr in qualname.split('.'):
+        obj = getattr(obj, attr)
+    cache[name] = obj
+    return obj
+
+
+def export_topology(box):
+    ''' Return the topology of a SignalBox as a dictionary
+
+    Args:
+        box (SignalBox): The box.
+
+    Returns:
+        dict: The topology, which contains only JSON-compatible types if
+        the signal attrs, docs and receiver key word arguments do.
+    '''
+    containers = []
+    names = {}
+    for cid, c in list(box.containers.items()):
+        signals = [_export_signal(s, names) for s in list(c.values())]
+        containers.append([cid, signals])
+    return {'version': VERSION, 'containers': containers}
+
+
+def _export_signal(s, names):
+    receivers = []
+    with s._lock:
+        for p, receiver_id in s._order:
+            ref = s._receivers[receiver_id]
+            receiver = ref if receiver_id in s._strong else ref()
+            if receiver is None:
+                continue
+            key = id(receiver)
+            if key not in names:
+                # Keep the receiver so its id isn't reused
+                names[key] = (receiver, _qualified_name(receiver))
+            name = names[key][1]
+            if name is None:
+                continue
+            receivers.append([name, s._priorities[receiver_id],
+                              s._receiver_kwargs[receiver_id]])
+    exported = {'name': s.name, 'doc': s.doc, 'attrs': s.attrs,
+                'receiver_limit': s._receiver_limit,
+                'receivers': receivers}
+    if s._filter_kwargs:
+        exported['filter_kwargs'] = True
+    return exported
+
+
+def apply_topology(box, topology):
+    ''' Create the containers, signals and connections in a topology
+
+    Args:
+        box (SignalBox): The box to add them to.
+        topology (dict): A topology returned by export_topology.
+
+    Returns:
+        int: The number of receivers connected.
+    '''
+    if topology.get('version') != VERSION:
+        raise ValueError('Unsupported topology version: ' +
+                         str(topology.get('version')))
+    cache = {}
+    count = 0
+    for cid, signals in topology['containers']:
+        c = box.get_container(cid)
+        for spec in signals:
+            kwargs = {'receiver_limit': spec['receiver_limit']}
+            if spec.get('filter_kwargs'):
+                kwargs['filter_kwargs'] = True
+            s = c.get(spec['name'], doc=spec['doc'], attrs=spec['attrs'],
+                      **kwargs)
+            count += _connect(s, spec['receivers'], cache)
+    return count
+
+
+def _connect(s, receivers, cache):
+    ''' Connect runs of receivers that share their settings in bulk '''
+    count = 0
+    i = 0
+    n = len(receivers)
+    while i < n:
+        name, priority, receiver_kwargs = receivers[i]
+        j = i + 1
+        while j < n and receivers[j][1:] == receivers[i][1:]:
+            j += 1
+        fns = [_resolve(r[0], cache) for r in receivers[i:j]]
+        s.connect_many(fns, priority=priority, strong=True,
+                       **receiver_kwargs)
+        count += j - i
+        i = j
+    return count
+
+
+def save_topology(box, path):
+    ''' Save the topology of a SignalBox to a JSON file
+
+    Args:
+        box (SignalBox): The box.
+        path (str): The file path.
+    '''
+    with open(path, 'w') as f:
+        json.dump(export_topology(box), f, separators=(',', ':'))
+
+
+def load_topology(box, path):
+    ''' Load a topology from a JSON file into a SignalBox
+
+    Args:
+        box (SignalBox): The box to add the containers and signals to.
+        path (str): The file path.
+
+    Returns:
+        int: The number of receivers connected.
+    '''
+    with open(path) as f:
+        topology = json.load(f)
+    return apply_topology(box, topology)
@@ -0,0 +1,121 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 16:37:52 2026
+
+@author: Reuben
+
+The vector module provides conditions that are checked for all of a signal's
+receivers at once. The signal stores the receiver key word arguments that a
+vectorised condition needs in NumPy arrays - one column per key word, with a
+row for each receiver - and the condition returns a boolean mask over the
+rows. Only the receivers that are selected by the mask are called. This
+suits signals with thousands of receivers, such as receivers that each watch
+a region of space, where calling a check for each receiver would dominate.
+
+"""
+
+from .condition import Condition
+
+
+class VectorCondition(Condition):
+    ''' A condition that is checked for all receivers at once
+
+    Args:
+        keys (list): The names of the receiver key word arguments to store in
+            columns.
+        fn (callable): A function that takes a dictionary of columns and a
+            dictionary of emit key word arguments, and returns a boolean
+            NumPy array with a value for each receiver.
+        name (str): The name of the condition. Defaults to the name of fn.
+        dtype (str): The NumPy dtype of the columns. Defaults to 'float64'.
+
+    Note:
+        Receivers that were connected without one of the keys get NaN in its
+        column, so comparisons with it are False. Vectorised conditions can
+        be combined with other conditions, which are checked for the
+        selected receivers only.
+    '''
+    vectorised = True
+
+    def __init__(self, keys, fn, name=None, dtype='float64'):
+        self.keys = tuple(keys)
+        self.fn = fn
+        self.name = fn.__name__ if name is None else name
+        self.dtype = dtype
+
+    def columns(self, receiver_kwargs):
+        ''' Build the columns of receiver key word arguments
+
+        Args:
+            receiver_kwargs (list): The key word arguments of each receiver,
+                in dispatch order.
+
+        Returns:
+            dict: A NumPy array for each key.
+        '''
+        import numpy as np
+        nan = np.nan
+        return {key: np.array([kw.get(key, nan) for kw in receiver_kwargs],
+                              dtype=self.dtype)
+                for key in self.keys}
+
+    def mask(self, columns, kwargs):
+        ''' Return a boolean array that selects receivers
+
+        Args:
+            columns (dict): The columns returned by the columns method.
+            kwargs (dict): The emit key word arguments.
+
+        Returns:
+            ndarray: A boolean array with a value for each receiver.
+        '''
+        return self.fn(columns, kwargs)
+
+    def check(self, **kwargs):
+        ''' Check the condition for a single set of key word arguments
+
+        Returns:
+            bool: True if the condition passes.
+        '''
+        return bool(self.mask(self.columns([kwargs]), kwargs)[0])
+
+
+class Between(VectorCondition):
+    ''' Select receivers whose bounds contain an emitted value
+
+    Args:
+        key (str): The name of the emit key word argument.
+        low (str): The name of the receiver key word argument that holds the
+            lower bound.
+        high (str): The name of the receiver key word argument that holds the
+            upper bound.
+        name (str): The name of the condition. Defaults to a description of
+            the bounds.
+        dtype (str): The NumPy dtype of the bounds. Defaults to 'float64'.
+
+    Note:
+        The bounds are inclusive. No receivers are selected if the key is not
+        emitted.
+
+    Example:
+        signal.add_condition(Between('x', 'x0', 'x1'))
+        signal.connect(region.moved, x0=0, x1=10)
+    '''
+
+    def __init__(self, key, low, high, name=None, dtype='float64'):
+        if name is None:
+            name = ('Between(' + repr(key) + ', ' + repr(low) + ', ' +
+                    repr(high) + ')')
+        super().__init__((low, high), self._between, name=name, dtype=dtype)
+        self.key = key
+        self.low = low
+        self.high = high
+
+    def _between(self, columns, kwargs):
+        lows = columns[self.low]
+        try:
+            value = kwargs[self.key]
+        except KeyError:
+            import numpy as np
+            return np.zeros(len(lows), dtype=bool)
+        return (lows <= value) & (value <= columns[self.high])
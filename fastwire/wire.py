@@ -10,6 +10,8 @@ hold normal a normal reference to the callable.
 
 """
 
+import sys
+import threading
 import warnings
 
 from . import box, container
@@ -73,6 +75,31 @@ class Wire():
         self.emit = self._old
         del self._old
         
+    def freeze(self):
+        ''' Does nothing, as wires hold normal references already '''
+        pass
+        
+    def unfreeze(self):
+        ''' Does nothing, as wires hold normal references already '''
+        pass
+        
+    def memory_report(self):
+        ''' Report the number and approximate size of the wire's parts
+        
+        Returns:
+            dict: A dictionary in the same form as Signal.memory_report.
+        '''
+        getsizeof = sys.getsizeof
+        n = 1 if self.receivers_present else 0
+        empty = {'count': 0, 'bytes': 0}
+        return {
+            'signals': {'count': 1,
+                        'bytes': getsizeof(self) + getsizeof(self.__dict__)},
+            'receivers': {'count': n, 'bytes': n * getsizeof(self.emit)},
+            'receiver_kwargs': empty.copy(),
+            'conditions': empty.copy(),
+            'finalizers': empty.copy()}
+        
     def set_default(self, default):
         self._default_return = default
         self.emit = self._default
@@ -106,8 +133,8 @@ class Wire():
 class WireContainer(container.Container):
     ''' A dictionary-like collection of Signal instances '''
     
-    def __init__(self, cid=None):
-        super().__init__(signal_cls=Wire, cid=cid)
+    def __init__(self, cid=None, handles=None):
+        super().__init__(signal_cls=Wire, cid=cid, handles=handles)
         
     def wire(self, name=None, doc=None, attrs=None, **kwargs):    
         ''' Create or get a new wire instance
@@ -138,17 +165,40 @@ class WireBox(box.Box):
 
 
 wire_boxes = {}
+_wire_boxes_lock = threading.Lock()
 
 def wire_box(name):
-    if name not in wire_boxes:
-        wire_boxes[name] = WireBox()
-    return wire_boxes[name]
+    try:
+        return wire_boxes[name]
+    except KeyError:
+        pass
+    with _wire_boxes_lock:
+        if name not in wire_boxes:
+            wire_boxes[name] = WireBox()
+        return wire_boxes[name]
 
 def wire_container(name):
     box = wire_box('default')
     return box.get_container(name)
 
-default_wire_box = wire_box('default')
-default_wire_container = wire_container('default')
-wire = default_wire_container.wire
-get_wire_box = wire_box
\ No newline at end of file
+def wire(name=None, doc=None, attrs=None, **kwargs):
+    ''' Create or get a new wire instance in the default container
+    
+    Args:
+        name (str): A name of the wire/signal [optional]
+        doc (str): A documentation string for the wire/signal [optional]
+        attrs (dict): Optional diction of signal attributes.
+    '''
+    return wire_container('default').wire(name=name, doc=doc, attrs=attrs,
+                                          **kwargs)
+
+get_wire_box = wire_box
+
+def __getattr__(name):
+    # The default box and container are only created when they're first
+    # used, to keep importing fast.
+    if name == 'default_wire_box':
+        return wire_box('default')
+    if name == 'default_wire_container':
+        return wire_container('default')
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
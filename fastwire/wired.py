@@ -20,12 +20,13 @@ class Wired():
                 sigs = inst.__getattribute__('_connected_signals')
             except AttributeError:
                 return
-            for name, (s, box, container, receiver_kwargs) in sigs.items():
-                if 'receiver_limit' in receiver_kwargs:
-                    receiver_limit = receiver_kwargs['receiver_limit']
+            for name, entry in sigs.items():
+                s, box, container, receiver_kwargs, handle = entry
+                receiver_limit = receiver_kwargs.get('receiver_limit')
+                if handle is not None:
+                    s = box.at(handle, receiver_limit=receiver_limit)
                 else:
-                    receiver_limit = None
-                s = ensure_signal_obj(s, box, container, receiver_limit)
+                    s = ensure_signal_obj(s, box, container, receiver_limit)
                 s.connect(inst.__getattribute__(name), **receiver_kwargs)
         
         try:
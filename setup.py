@@ -40,4 +40,7 @@ setuptools.setup(
         "Topic :: Software Development :: Libraries :: Python Modules"
     ],
     install_requires=[],
+    extras_require={
+        'numpy': ['numpy'],
+    },
 )
\ No newline at end of file
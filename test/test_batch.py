@@ -0,0 +1,136 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 09:05:31 2026
+
+@author: Reuben
+"""
+
+import fastwire
+
+import unittest
+import time
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+@unittest.skipIf(np is None, 'NumPy is not installed')
+class Test_BatchSignal(unittest.TestCase):
+
+    def test_batch_size(self):
+        signal = fastwire.BatchSignal(batch_size=3)
+        batches = []
+
+        def connected(value):
+            batches.append(value)
+
+        signal.connect(connected, batch=True)
+        for i in range(7):
+            signal.emit(value=i)
+        self.assertEqual(len(batches), 2)
+        np.testing.assert_array_equal(batches[0], [0, 1, 2])
+        np.testing.assert_array_equal(batches[1], [3, 4, 5])
+        self.assertEqual(signal.pending, 1)
+        signal.flush()
+        np.testing.assert_array_equal(batches[2], [6])
+
+    def test_columns(self):
+        signal = fastwire.BatchSignal(batch_size=2,
+                                      dtype={'count': 'int64'})
+        batches = []
+
+        def connected(x, count):
+            batches.append((x, count))
+
+        signal.connect(connected, batch=True)
+        signal.emit(x=0.5, count=1)
+        signal.emit(x=1.5, count=2)
+        x, count = batches[0]
+        np.testing.assert_array_equal(x, [0.5, 1.5])
+        np.testing.assert_array_equal(count, [1, 2])
+        self.assertEqual(count.dtype, np.int64)
+
+    def test_missing_values(self):
+        signal = fastwire.BatchSignal(batch_size=2)
+        batches = []
+
+        def connected(x, y):
+            batches.append((x, y))
+
+        signal.connect(connected, batch=True)
+        signal.emit(x=1.0)
+        signal.emit(x=2.0, y=3.0)
+        x, y = batches[0]
+        self.assertTrue(np.isnan(y[0]))
+        self.assertEqual(y[1], 3.0)
+
+    def test_per_event_receivers(self):
+        signal = fastwire.BatchSignal(batch_size=2)
+        events = []
+        batches = []
+
+        def per_event(value):
+            events.append(value)
+
+        def per_batch(value):
+            batches.append(value)
+
+        signal.connect(per_event)
+        signal.connect(per_batch, batch=True)
+        signal.emit(value=1)
+        self.assertEqual(events, [1])
+        self.assertEqual(batches, [])
+        signal.emit(value=2)
+        self.assertEqual(events, [1, 2])
+        self.assertEqual(len(batches), 1)
+
+    def test_interval(self):
+        signal = fastwire.BatchSignal(batch_size=100, interval=0.01)
+        batches = []
+
+        def connected(value):
+            batches.append(value)
+
+        signal.connect(connected, batch=True)
+        signal.emit(value=1)
+        time.sleep(0.02)
+        signal.emit(value=2)
+        np.testing.assert_array_equal(batches[0], [1, 2])
+
+    def test_disconnect(self):
+        signal = fastwire.BatchSignal(batch_size=1)
+        batches = []
+
+        def connected(value):
+            batches.append(value)
+
+        receiver_id = signal.connect(connected, batch=True)
+        signal.disconnect(receiver_id)
+        signal.emit(value=1)
+        self.assertEqual(batches, [])
+        self.assertEqual(signal.pending, 0)
+
+    def test_condition(self):
+        signal = fastwire.BatchSignal(batch_size=2,
+                                      condition=fastwire.C.gt('value', 0))
+        batches = []
+        received = []
+
+        def connected(value):
+            batches.append(value)
+
+        def per_event(value):
+            received.append(value)
+
+        signal.connect(connected, batch=True)
+        signal.connect(per_event)
+        for value in (-1, 1, 2):
+            signal.emit(value=value)
+        self.assertEqual(received, [1, 2])
+        np.testing.assert_array_equal(batches[0], [-1, 1])
+        signal.add_condition(fastwire.C.lt('value', 10))
+        signal.emit(value=20)
+        self.assertEqual(received, [1, 2])
+        np.testing.assert_array_equal(batches[1], [2, 20])
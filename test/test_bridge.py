@@ -0,0 +1,184 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 10:02:17 2026
+
+@author: Reuben
+"""
+
+import fastwire
+from fastwire import bridge
+
+import unittest
+import multiprocessing
+import os
+import tempfile
+import threading
+
+
+def peer(conn, n):
+    box = fastwire.SignalBox()
+    box.add('shared')
+    done = box.get_container('shared').get('done')
+    count = [0]
+    
+    def tick(value):
+        count[0] += value
+        if count[0] == n:
+            done.emit(total=count[0])
+    
+    box.get_container('shared').get('tick').connect(tick)
+    b = fastwire.SignalBridge(conn, box, ['shared'])
+    b.join(30)
+    b.close()
+
+
+class Test_Bridge(unittest.TestCase):
+
+    def make_pair(self, **kwargs):
+        conn_a, conn_b = multiprocessing.Pipe()
+        box_a = fastwire.SignalBox()
+        box_b = fastwire.SignalBox()
+        c_a = box_a.get_container('shared')
+        c_b = box_b.get_container('shared')
+        c_a.get('sig')
+        c_b.get('sig')
+        bridge_a = fastwire.SignalBridge(conn_a, box_a, ['shared'], **kwargs)
+        bridge_b = fastwire.SignalBridge(conn_b, box_b, ['shared'], **kwargs)
+        return c_a, c_b, bridge_a, bridge_b
+
+    def test_emit_mirrored(self):
+        c_a, c_b, bridge_a, bridge_b = self.make_pair()
+        received = []
+        event = threading.Event()
+        
+        def connected(a):
+            received.append(a)
+            event.set()
+        
+        c_b['sig'].connect(connected)
+        c_a['sig'].emit(a=5.7)
+        self.assertTrue(event.wait(5))
+        self.assertEqual(received, [5.7])
+        bridge_a.close()
+        bridge_b.close()
+
+    def test_no_echo(self):
+        c_a, c_b, bridge_a, bridge_b = self.make_pair()
+        received = []
+        event = threading.Event()
+        
+        def connected(a):
+            received.append(a)
+            event.set()
+        
+        c_a['sig'].connect(connected)
+        c_b['sig'].connect(lambda a: None)
+        c_a['sig'].emit(a=1)
+        bridge_a.flush()
+        self.assertEqual(received, [1])
+        bridge_a.close()
+        bridge_b.close()
+        self.assertEqual(received, [1])
+        self.assertEqual(bridge_a.received, 0)
+
+    def test_batching(self):
+        c_a, c_b, bridge_a, bridge_b = self.make_pair(batch_size=10,
+                                                      window=10)
+        received = []
+        event = threading.Event()
+        
+        def connected(a):
+            received.append(a)
+            if len(received) == 10:
+                event.set()
+        
+        c_b['sig'].connect(connected)
+        for i in range(9):
+            c_a['sig'].emit(a=i)
+        self.assertEqual(bridge_a.sent, 0)
+        c_a['sig'].emit(a=9)
+        self.assertEqual(bridge_a.sent, 10)
+        self.assertTrue(event.wait(5))
+        self.assertEqual(received, list(range(10)))
+        bridge_a.close()
+        bridge_b.close()
+
+    def test_receiver_error(self):
+        c_a, c_b, bridge_a, bridge_b = self.make_pair()
+        received = []
+        event = threading.Event()
+        
+        def connected(a):
+            if a == 1:
+                raise ValueError('Failed')
+            received.append(a)
+            event.set()
+        
+        c_b['sig'].connect(connected)
+        with self.assertLogs('fastwire.bridge', 'ERROR'):
+            c_a['sig'].emit(a=1)
+            bridge_a.flush()
+            c_a['sig'].emit(a=2)
+            self.assertTrue(event.wait(5))
+        self.assertEqual(received, [2])
+        self.assertTrue(bridge_b.running)
+        bridge_a.close()
+        bridge_b.close()
+
+    def test_close_disconnects(self):
+        c_a, c_b, bridge_a, bridge_b = self.make_pair()
+        bridge_a.close()
+        bridge_b.close()
+        self.assertEqual(c_a['sig'].n, 0)
+        self.assertFalse(bridge_a.running)
+
+    def test_unix_socket(self):
+        box_a = fastwire.SignalBox()
+        box_b = fastwire.SignalBox()
+        received = []
+        event = threading.Event()
+        
+        def connected(a):
+            received.append(a)
+            event.set()
+
+        box_b.get_container('shared').get('sig').connect(connected)
+        with tempfile.TemporaryDirectory() as tmp:
+            address = os.path.join(tmp, 'bridge.sock')
+            ret = {}
+            t = threading.Thread(target=lambda: ret.setdefault(
+                'bridge', bridge.listen(address, box_b, ['shared'])))
+            t.start()
+            while not os.path.exists(address):
+                t.join(0.01)
+            bridge_a = bridge.connect(address, box_a)
+            bridge_a.attach('shared', ['sig'])
+            t.join()
+            box_a.get_container('shared')['sig'].emit(a=3)
+            self.assertTrue(event.wait(5))
+            bridge_a.close()
+            ret['bridge'].close()
+        self.assertEqual(received, [3])
+
+    def test_peer_process(self):
+        conn_a, conn_b = multiprocessing.Pipe()
+        n = 100
+        p = multiprocessing.Process(target=peer, args=(conn_b, n))
+        p.start()
+        conn_b.close()
+        box = fastwire.SignalBox()
+        c = box.get_container('shared')
+        tick = c.get('tick')
+        event = threading.Event()
+        
+        def done(total):
+            event.set()
+        
+        c.get('done').connect(done)
+        b = fastwire.SignalBridge(conn_a, box, ['shared'])
+        for i in range(n):
+            tick.emit(value=1)
+        self.assertTrue(event.wait(10))
+        b.close()
+        p.join(10)
+        self.assertEqual(p.exitcode, 0)
@@ -58,4 +58,174 @@ class Test_Condition(unittest.TestCase):
         signal.emit(a=val)
         self.assertEqual(a._a, val)
         signal.emit(a=15)
-        self.assertEqual(a._a, 15)
\ No newline at end of file
+        self.assertEqual(a._a, 15)
+
+    def test_condition_per_receiver(self):
+        signal = fastwire.Signal()
+        
+        class Limit_Condition():
+            name = 'limit'
+            def check(self, a, limit, **kwargs):
+                return a < limit
+        
+        class A():
+            def connected(self, a):
+                self._a = a
+
+        a_1 = A()
+        a_2 = A()
+        signal.connect(a_1.connected, limit=10)
+        signal.connect(a_2.connected, limit=20)
+        signal.add_condition(Limit_Condition())
+        signal.emit(a=5)
+        signal.emit(a=15)
+        self.assertEqual(a_1._a, 5)
+        self.assertEqual(a_2._a, 15)
+
+    def test_predicate(self):
+        C = fastwire.C
+        signal = fastwire.Signal()
+        received = []
+        
+        def connected(mode, id):
+            received.append((mode, id))
+            
+        signal.connect(connected)
+        signal.add_condition(C.eq('mode', 'fast') & ~C.in_('id', [1, 2]))
+        signal.emit(mode='fast', id=1)
+        signal.emit(mode='fast', id=3)
+        signal.emit(mode='slow', id=3)
+        self.assertEqual(received, [('fast', 3)])
+        
+    def test_predicate_or(self):
+        C = fastwire.C
+        pred = C.lt('a', 0) | C.gt('a', 10)
+        self.assertTrue(pred.check(a=-1))
+        self.assertFalse(pred.check(a=5))
+        self.assertTrue(pred.check(a=11))
+        self.assertFalse(pred.check(b=11)) # a is missing
+        self.assertTrue((~C.eq('a', 1)).check(b=1))
+        self.assertTrue(C.test('a', callable).check(a=print))
+        self.assertEqual(repr(pred), "(C.lt('a', 0) | C.gt('a', 10))")
+        
+    def test_predicate_receiver_kwargs(self):
+        C = fastwire.C
+        signal = fastwire.Signal()
+        
+        class A():
+            def connected(self, a, **kwargs):
+                self._a = a
+
+        a_1 = A()
+        a_2 = A()
+        signal.connect(a_1.connected, mode='fast')
+        signal.connect(a_2.connected, mode='slow')
+        signal.add_condition(C.eq('mode', 'fast'))
+        signal.emit(a=5)
+        self.assertEqual(a_1._a, 5)
+        self.assertFalse(hasattr(a_2, '_a'))
+        signal.emit(a=6, mode='fast') # Emit arguments take precedence
+        self.assertEqual(a_1._a, 6)
+        self.assertEqual(a_2._a, 6)
+        
+    def test_predicate_with_condition(self):
+        C = fastwire.C
+        signal = fastwire.Signal()
+        received = []
+        
+        def connected(a):
+            received.append(a)
+
+        signal.add_condition(My_Condition())
+        signal.add_condition(C.ne('a', 3) & My_Condition())
+        signal.connect(connected)
+        for a in range(12):
+            signal.emit(a=a)
+        self.assertEqual(received, [0, 1, 2, 4, 5, 6, 7, 8, 9])
+        signal.remove_condition(My_Condition.name)
+        signal.emit(a=3)
+        signal.emit(a=20)
+        self.assertEqual(received[-1], 9)
+
+    def test_condition_checked_once_per_group(self):
+        signal = fastwire.Signal()
+        checks = []
+        
+        class Counting_Condition():
+            name = 'counting'
+            def check(self, view, **kwargs):
+                checks.append(view)
+                return view == 'main'
+        
+        class A():
+            def connected(self, a, **kwargs):
+                self._a = a
+
+        main = [A() for i in range(5)]
+        other = [A() for i in range(3)]
+        for a in main:
+            signal.connect(a.connected, view='main')
+        signal.connect_many([a.connected for a in other], view='other')
+        signal.add_condition(Counting_Condition())
+        signal.emit(a=1)
+        self.assertEqual(sorted(checks), ['main', 'other'])
+        self.assertTrue(all(a._a == 1 for a in main))
+        self.assertFalse(any(hasattr(a, '_a') for a in other))
+        late = A()
+        signal.connect(late.connected, view='main') # Joins the group
+        checks.clear()
+        signal.emit(a=2)
+        self.assertEqual(sorted(checks), ['main', 'other'])
+        self.assertEqual(late._a, 2)
+        
+    def test_condition_unhashable_receiver_kwargs(self):
+        signal = fastwire.Signal()
+        received = []
+        
+        def connected(a, **kwargs):
+            received.append(a)
+            
+        signal.connect(connected, tags=['x'])
+        signal.connect(connected, tags=['y'], priority=1)
+        signal.add_condition(fastwire.C.test('tags', lambda t: 'x' in t))
+        signal.emit(a=3)
+        self.assertEqual(received, [3])
+
+    def test_condition_while_muted(self):
+        signal = fastwire.Signal()
+        received = []
+
+        def connected(a):
+            received.append(a)
+
+        signal.connect(connected)
+        signal.mute()
+        signal.add_condition(My_Condition())
+        signal.emit(a=1) # Still muted
+        signal.unmute()
+        signal.emit(a=15) # Fails the condition
+        signal.emit(a=2)
+        self.assertEqual(received, [2])
+        signal.mute()
+        signal.remove_condition(My_Condition.name)
+        signal.emit(a=3)
+        signal.unmute()
+        signal.emit(a=15)
+        self.assertEqual(received, [2, 15])
+
+    def test_condition_after_reset(self):
+        signal = fastwire.Signal()
+        received = []
+
+        def connected(a, **kwargs):
+            received.append(a)
+
+        signal.mute()
+        signal.reset() # Unmutes the signal
+        signal.connect(connected, mode='x')
+        signal.add_condition(fastwire.C.eq('mode', 'y'))
+        signal.emit(a=1)
+        self.assertEqual(received, [])
+        signal.remove_condition(fastwire.C.eq('mode', 'y').name)
+        signal.emit(a=2)
+        self.assertEqual(received, [2])
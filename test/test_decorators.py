@@ -246,4 +246,16 @@ class Test_Container_Decorators(unittest.TestCase):
         self.assertEqual(len(signal._receivers.keys()), 1)
         val = 5.7
         signal.emit(a=val)
-        self.assertEqual(test[0], val)
\ No newline at end of file
+        self.assertEqual(test[0], val)
+
+    def test_receive_resolved_once(self):
+        container = fastwire.SignalContainer()
+
+        class A(fastwire.Wired):
+            @container.receive('test_signal')
+            def connected(self, a):
+                self._a = a
+
+        self.assertTrue('test_signal' in container)
+        self.assertIs(A._connected_signals['connected'][0],
+                      container['test_signal'])
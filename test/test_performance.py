@@ -9,6 +9,23 @@ import fastwire
 
 import unittest
 from timeit import timeit
+import gc
+import multiprocessing
+import os
+import subprocess
+import sys
+import threading
+import time
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+def topology_receiver(a):
+    pass
+
 
 class Test_Performance(unittest.TestCase):
 
@@ -48,4 +65,398 @@ class Test_Performance(unittest.TestCase):
         t_test = timeit('e(a=5)',
                         globals={'e': e},
                         number=n)
-        self.assertTrue(t_test/t_ref < 1.5)        
\ No newline at end of file
+        self.assertTrue(t_test/t_ref < 1.5)        
+
+    def test_connect_many_performance(self):
+        receivers = [(lambda a: None) for i in range(10000)]
+        signal = fastwire.Signal()
+        t0 = time.perf_counter()
+        for receiver in receivers:
+            signal.connect(receiver)
+        t_ref = time.perf_counter() - t0
+        signal = fastwire.Signal()
+        t0 = time.perf_counter()
+        signal.connect_many(receivers)
+        t_test = time.perf_counter() - t0
+        self.assertTrue(t_test/t_ref < 0.6)
+
+
+    def test_strong_emit_performance(self):
+        class A():
+            def connected(self, a):
+                pass
+
+        objs = [A() for i in range(100)]
+        weak = fastwire.Signal()
+        weak.connect_many([obj.connected for obj in objs])
+        strong = fastwire.Signal()
+        strong.connect_many([obj.connected for obj in objs], strong=True)
+        n = 2000
+        t_ref = 1e9
+        t_test = 1e9
+        for i in range(5):
+            # Alternate runs so that both see the same machine load
+            t_ref = min(t_ref, timeit('e(a=5)', globals={'e': weak.emit},
+                                      number=n))
+            t_test = min(t_test, timeit('e(a=5)', globals={'e': strong.emit},
+                                        number=n))
+        # Weak methods create a new bound method for every call
+        self.assertTrue(t_test/t_ref < 0.6)
+
+    def test_strong_connect_performance(self):
+        receivers = [(lambda a: None) for i in range(2000)]
+        t_ref = 1e9
+        t_test = 1e9
+        for i in range(5):
+            t0 = time.perf_counter()
+            fastwire.Signal().connect_many(receivers)
+            t_ref = min(t_ref, time.perf_counter() - t0)
+            signal = fastwire.Signal()
+            t0 = time.perf_counter()
+            signal.connect_many(receivers, strong=True)
+            t_test = min(t_test, time.perf_counter() - t0)
+            signal.reset()
+        self.assertTrue(t_test/t_ref < 0.8)
+
+    def test_filter_kwargs_emit_performance(self):
+        def connected(a):
+            pass
+
+        signal = fastwire.Signal()
+        signal.connect_many([connected] * 10)
+        filtering = fastwire.Signal(filter_kwargs=True)
+        filtering.connect_many([connected] * 10)
+        n = 3000
+        t_ref = 1e9
+        t_test = 1e9
+        for i in range(15):
+            # Alternate runs so that both see the same machine load
+            t_ref = min(t_ref, timeit('e(a=5)', globals={'e': signal.emit},
+                                      number=n))
+            t_test = min(t_test, timeit('e(a=5)',
+                                        globals={'e': filtering.emit},
+                                        number=n))
+        # Receivers that accept every emitted key get them unfiltered
+        self.assertTrue(t_test/t_ref < 2)
+
+    def test_topology_load_performance(self):
+        box = fastwire.SignalBox()
+        for cid in range(50):
+            c = box.get_container(cid)
+            for name in range(50):
+                c.get(name).connect_many([topology_receiver] * 10)
+        topology = fastwire.export_topology(box)
+        # A large topology, so that each run is long enough to time well
+        t_ref = 1e9
+        t_test = 1e9
+        for i in range(5):
+            t0 = time.perf_counter()
+            box = fastwire.SignalBox()
+            for cid in range(50):
+                c = box.get_container(cid)
+                for name in range(50):
+                    for j in range(10):
+                        c.get(name).connect(topology_receiver)
+            t_ref = min(t_ref, time.perf_counter() - t0)
+            t0 = time.perf_counter()
+            fastwire.apply_topology(fastwire.SignalBox(), topology)
+            t_test = min(t_test, time.perf_counter() - t0)
+        self.assertTrue(t_test/t_ref < 0.8)
+
+    def test_queued_emit_performance(self):
+        def slow(a):
+            time.sleep(0.001)
+        
+        signal = fastwire.Signal()
+        signal.connect(slow)
+        queued = fastwire.QueuedSignal(maxsize=200)
+        queued.connect(slow)
+        t0 = time.perf_counter()
+        for i in range(100):
+            signal.emit(a=i)
+        t_ref = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        for i in range(100):
+            queued.emit(a=i)
+        t_test = time.perf_counter() - t0
+        queued.drain()
+        queued.stop()
+        self.assertTrue(t_test/t_ref < 0.1)
+
+    def test_predicate_emit_performance(self):
+        class Mode_Condition():
+            name = 'mode'
+            def check(self, mode, a, **kwargs):
+                return mode == 'fast' and a < 10
+
+        def connected(a, **kwargs):
+            pass
+
+        signal = fastwire.Signal()
+        signal.add_condition(Mode_Condition())
+        predicated = fastwire.Signal()
+        predicated.add_condition(fastwire.C.eq('mode', 'fast') &
+                                 fastwire.C.lt('a', 10))
+        for s in (signal, predicated):
+            for i in range(10):
+                s.connect(connected, mode='fast', index=i)
+        n = 10000
+        t_ref = min(timeit('e(a=5)', globals={'e': signal.emit}, number=n)
+                    for i in range(5))
+        t_test = min(timeit('e(a=5)', globals={'e': predicated.emit},
+                            number=n) for i in range(5))
+        self.assertTrue(t_test/t_ref < 0.9)
+
+    def test_grouped_condition_emit_performance(self):
+        class View_Condition():
+            name = 'view'
+            def check(self, view, **kwargs):
+                return view == 'main'
+
+        def connected(a, **kwargs):
+            pass
+
+        signal = fastwire.Signal()
+        grouped = fastwire.Signal()
+        for s in (signal, grouped):
+            s.add_condition(View_Condition())
+        for i in range(100):
+            signal.connect(connected, view='main', index=i)
+            grouped.connect(connected, view='main')
+        n = 2000
+        t_ref = min(timeit('e(a=5)', globals={'e': signal.emit}, number=n)
+                    for i in range(3))
+        t_test = min(timeit('e(a=5)', globals={'e': grouped.emit},
+                            number=n) for i in range(3))
+        self.assertTrue(t_test/t_ref < 0.5)
+
+    @unittest.skipIf(np is None, 'NumPy is not installed')
+    def test_vector_condition_emit_performance(self):
+        class Region_Condition():
+            name = 'region'
+            def check(self, x, x0, x1, **kwargs):
+                return x0 <= x <= x1
+
+        class Region():
+            def moved(self, x, **kwargs):
+                pass
+
+        regions = [Region() for i in range(2000)]
+        signal = fastwire.Signal(condition=Region_Condition())
+        vector = fastwire.Signal(condition=fastwire.Between('x', 'x0', 'x1'))
+        for s in (signal, vector):
+            for i, region in enumerate(regions):
+                s.connect(region.moved, x0=i, x1=i + 1)
+        vector.emit(x=0) # Build the columns
+        n = 20
+        t_ref = min(timeit('e(x=500.5)', globals={'e': signal.emit},
+                           number=n) for i in range(3))
+        t_test = min(timeit('e(x=500.5)', globals={'e': vector.emit},
+                            number=n) for i in range(3))
+        self.assertTrue(t_test/t_ref < 0.1)
+
+    def test_budget_demote_performance(self):
+        def slow(a):
+            time.sleep(0.002)
+
+        def fast(a):
+            pass
+
+        signal = fastwire.Signal()
+        budgeted = fastwire.Signal()
+        budgeted.set_budget(0.001, demote=True)
+        for s in (signal, budgeted):
+            s.connect(slow)
+            s.connect_many([fast] * 10)
+        with self.assertLogs('fastwire.signal', 'WARNING'):
+            budgeted.emit(a=0) # Demotes slow
+        n = 20
+        t_ref = timeit('e(a=5)', globals={'e': signal.emit}, number=n)
+        t_test = timeit('e(a=5)', globals={'e': budgeted.emit}, number=n)
+        self.assertTrue(t_test/t_ref < 0.2)
+
+    def test_isolated_emit_performance(self):
+        def connected(a):
+            pass
+
+        # With many receivers, the one try block per emit is negligible
+        signal = fastwire.Signal()
+        signal.connect_many([connected] * 100)
+        isolated = fastwire.Signal(isolate=True)
+        isolated.connect_many([connected] * 100)
+        n = 1000
+        t_ref = 1e9
+        t_test = 1e9
+        for i in range(15):
+            # Alternate runs so that both see the same machine load
+            t_ref = min(t_ref, timeit('e(a=5)', globals={'e': signal.emit},
+                                      number=n))
+            t_test = min(t_test, timeit('e(a=5)',
+                                        globals={'e': isolated.emit},
+                                        number=n))
+        self.assertTrue(t_test/t_ref < 1.5)
+
+    def test_reentry_emit_performance(self):
+        def connected(a):
+            pass
+
+        signal = fastwire.Signal()
+        signal.connect_many([connected] * 10)
+        guarded = fastwire.Signal(reentry='raise')
+        guarded.connect_many([connected] * 10)
+        n = 5000
+        t_ref = 1e9
+        t_test = 1e9
+        for i in range(15):
+            # Alternate runs so that both see the same machine load
+            t_ref = min(t_ref, timeit('e(a=5)', globals={'e': signal.emit},
+                                      number=n))
+            t_test = min(t_test, timeit('e(a=5)',
+                                        globals={'e': guarded.emit},
+                                        number=n))
+        self.assertTrue(t_test/t_ref < 1.5)
+
+    def test_reentry_cycle_performance(self):
+        def loop(a, b):
+            def on_a():
+                b.emit()
+
+            def on_b():
+                a.emit()
+
+            a.connect(on_a, strong=True)
+            b.connect(on_b, strong=True)
+            t0 = time.perf_counter()
+            try:
+                a.emit()
+            except (RecursionError, fastwire.ReentryError):
+                pass
+            return time.perf_counter() - t0
+
+        t_ref = loop(fastwire.Signal(), fastwire.Signal())
+        t_test = loop(fastwire.Signal(reentry='raise'), fastwire.Signal())
+        self.assertTrue(t_test/t_ref < 0.1)
+
+def bridge_peer(conn, n):
+    box = fastwire.SignalBox()
+    c = box.get_container('bench')
+    done = c.get('done')
+    count = [0]
+    
+    def tick(value):
+        count[0] += 1
+        if count[0] == n:
+            done.emit(total=count[0])
+    
+    c.get('tick').connect(tick)
+    b = fastwire.SignalBridge(conn, box, ['bench'])
+    b.join(60)
+    b.close()
+
+
+class Test_Bridge_Performance(unittest.TestCase):
+    
+    def test_bridge_throughput(self):
+        conn_a, conn_b = multiprocessing.Pipe()
+        n = 100000
+        p = multiprocessing.Process(target=bridge_peer, args=(conn_b, n))
+        p.start()
+        conn_b.close()
+        box = fastwire.SignalBox()
+        c = box.get_container('bench')
+        tick = c.get('tick')
+        event = threading.Event()
+        
+        def done(total):
+            event.set()
+            
+        c.get('done').connect(done)
+        b = fastwire.SignalBridge(conn_a, box, ['bench'], batch_size=1024)
+        e = tick.emit
+        t0 = time.perf_counter()
+        for i in range(n):
+            e(value=i)
+        b.flush()
+        self.assertTrue(event.wait(60))
+        rate = n / (time.perf_counter() - t0)
+        b.close()
+        p.join(10)
+        self.assertTrue(rate > 50000)
+
+
+class Test_Import_Performance(unittest.TestCase):
+    
+    def test_import_time(self):
+        code = ('import fastwire, sys; '
+                'print(len(sys.modules["fastwire.signal"].signal_boxes), '
+                'len(sys.modules["fastwire.wire"].wire_boxes))')
+        result = subprocess.run([sys.executable, '-X', 'importtime', '-c',
+                                 code], capture_output=True, text=True,
+                                check=True)
+        times = {}
+        for line in result.stderr.splitlines():
+            if line.startswith('import time:') and '|' in line:
+                self_us, cumulative, module = line[12:].split('|')
+                if cumulative.strip().isdigit():
+                    times[module.strip()] = int(cumulative)
+        self.assertIn('fastwire', times)
+        for module in ['fastwire.bridge', 'fastwire.shm', 'fastwire.batch',
+                       'multiprocessing', 'pickle', 'inspect', 'logging']:
+            self.assertNotIn(module, times)
+        # No default boxes are created on import
+        self.assertEqual(result.stdout.split(), ['0', '0'])
+
+
+def private_dirty():
+    ''' Return the private dirty memory of this process in kB '''
+    with open('/proc/self/smaps_rollup') as f:
+        for line in f:
+            if line.startswith('Private_Dirty:'):
+                return int(line.split()[1])
+
+
+class Fork_Receiver():
+    def connected(self, a):
+        pass
+
+
+def forked_growth(signals):
+    ''' Return the private memory growth of a forked child after emits '''
+    r, w = os.pipe()
+    pid = os.fork()
+    if pid == 0:
+        os.close(r)
+        before = private_dirty()
+        for i in range(10):
+            for s in signals:
+                s.emit(a=i)
+        gc.collect()
+        os.write(w, str(private_dirty() - before).encode())
+        os._exit(0)
+    os.close(w)
+    with os.fdopen(r) as f:
+        growth = int(f.read())
+    os.waitpid(pid, 0)
+    return growth
+
+
+@unittest.skipUnless(os.path.exists('/proc/self/smaps_rollup')
+                     and hasattr(os, 'fork'), 'Needs Linux and fork')
+class Test_Fork_Performance(unittest.TestCase):
+    
+    def test_freeze_private_memory(self):
+        box = fastwire.SignalBox()
+        receivers = [Fork_Receiver() for i in range(2000)]
+        c = box.get_container('workers')
+        for i in range(2000):
+            c.get(i).connect_many([r.connected for r in receivers[i:i + 5]])
+        signals = list(c.values())
+        gc.collect()
+        unfrozen = forked_growth(signals)
+        box.freeze()
+        try:
+            frozen = forked_growth(signals)
+        finally:
+            gc.unfreeze()
+            box.unfreeze()
+        self.assertTrue(frozen < unfrozen / 2)
@@ -0,0 +1,177 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 15:20:14 2026
+
+@author: Reuben
+"""
+
+import fastwire
+
+import gc
+import queue
+import threading
+import time
+import unittest
+import weakref
+
+
+class Test_QueuedSignal(unittest.TestCase):
+
+    def test_emit(self):
+        signal = fastwire.QueuedSignal()
+        received = []
+
+        def connected(a):
+            received.append((a, threading.current_thread()))
+
+        signal.connect(connected)
+        for i in range(5):
+            signal.emit(a=i)
+        self.assertTrue(signal.drain(5))
+        self.assertEqual([a for a, thread in received], [0, 1, 2, 3, 4])
+        self.assertNotEqual(received[0][1], threading.current_thread())
+        self.assertEqual(signal.delivered, 5)
+        signal.stop()
+
+    def test_returns_immediately(self):
+        signal = fastwire.QueuedSignal()
+        release = threading.Event()
+        received = []
+
+        def connected(a):
+            release.wait(5)
+            received.append(a)
+
+        signal.connect(connected)
+        signal.emit(a=1)
+        signal.emit(a=2)
+        self.assertEqual(received, [])
+        release.set()
+        signal.drain(5)
+        self.assertEqual(received, [1, 2])
+        signal.stop()
+
+    def _blocked(self, overflow):
+        signal = fastwire.QueuedSignal(maxsize=2, overflow=overflow)
+        release = threading.Event()
+        started = threading.Event()
+
+        def connected(a):
+            started.set()
+            release.wait(5)
+
+        signal.connect(connected)
+        signal.emit(a=0)
+        started.wait(5) # The worker has taken the first emit
+        signal.emit(a=1)
+        signal.emit(a=2)
+        return signal, release
+
+    def test_drop(self):
+        signal, release = self._blocked('drop')
+        signal.emit(a=3)
+        self.assertEqual(signal.dropped, 1)
+        self.assertEqual(signal.depth, 2)
+        release.set()
+        signal.drain(5)
+        self.assertEqual(signal.delivered, 3)
+        signal.stop()
+
+    def test_raise(self):
+        signal, release = self._blocked('raise')
+        with self.assertRaises(queue.Full):
+            signal.emit(a=3)
+        release.set()
+        signal.stop()
+
+    def test_block(self):
+        signal, release = self._blocked('block')
+        threading.Timer(0.05, release.set).start()
+        signal.emit(a=3) # Waits for space
+        signal.drain(5)
+        self.assertEqual(signal.delivered, 4)
+        self.assertTrue(signal.max_depth >= 2)
+        signal.stop()
+
+    def test_condition_and_errors(self):
+        signal = fastwire.QueuedSignal(workers=2)
+        received = []
+
+        class Positive():
+            name = 'positive'
+            def check(self, a, **kwargs):
+                return a > 0
+
+        def connected(a):
+            if a == 2:
+                raise ValueError('Failed')
+            received.append(a)
+
+        signal.add_condition(Positive())
+        signal.connect(connected)
+        with self.assertLogs('fastwire.queued', 'ERROR'):
+            for i in range(-1, 4):
+                signal.emit(a=i)
+            signal.drain(5)
+        self.assertEqual(sorted(received), [1, 3])
+        self.assertEqual(signal.errors, 1)
+        signal.stop()
+
+    def test_bad_overflow(self):
+        with self.assertRaises(ValueError):
+            fastwire.QueuedSignal(overflow='wait')
+
+    def test_budget(self):
+        signal = fastwire.QueuedSignal(budget=0.005)
+        received = []
+
+        def slow(a):
+            time.sleep(0.02)
+            received.append(a)
+
+        receiver_id = signal.connect(slow)
+        with self.assertLogs('fastwire.signal', 'WARNING'):
+            signal.emit(a=1)
+            self.assertEqual(received, [])
+            signal.drain(5)
+        self.assertEqual(received, [1])
+        self.assertEqual(signal.overruns()[receiver_id]['count'], 1)
+        signal.stop()
+
+    def test_lazy_start(self):
+        signal = fastwire.QueuedSignal()
+        received = []
+
+        def connected(x):
+            received.append(x)
+
+        signal.connect(connected)
+        self.assertEqual(signal._threads, [])
+        signal.emit(x=1)
+        self.assertEqual(len(signal._threads), 1)
+        signal.stop()
+        signal.emit(x=2) # Starts the workers again
+        signal.drain(5)
+        self.assertEqual(received, [1, 2])
+        signal.stop()
+
+    def test_garbage_collected(self):
+        signal = fastwire.QueuedSignal(workers=2)
+        received = []
+
+        def connected(x):
+            received.append(x)
+
+        receiver_id = signal.connect(connected)
+        signal.emit(x=1)
+        signal.drain(5)
+        signal.disconnect(receiver_id)
+        threads = signal._threads
+        ref = weakref.ref(signal)
+        del signal
+        gc.collect()
+        self.assertIsNone(ref())
+        for thread in threads:
+            thread.join(5)
+            self.assertFalse(thread.is_alive())
+        self.assertEqual(received, [1])
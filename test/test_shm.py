@@ -0,0 +1,187 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 14:31:52 2026
+
+@author: Reuben
+"""
+
+import fastwire
+from fastwire import shm
+
+import unittest
+import multiprocessing
+import threading
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+def subscriber(name, conn):
+    signal = fastwire.Signal()
+    totals = []
+
+    def connected(frame, seq):
+        totals.append(sum(frame))
+
+    signal.connect(connected)
+    sub = shm.RingSubscriber(name, signal, latest=False)
+    conn.send('ready')
+    conn.recv()
+    sub.poll()
+    conn.send((totals, sub.overruns))
+    del connected
+    sub.ring.close()
+
+
+class Test_SharedRing(unittest.TestCase):
+    
+    def setUp(self):
+        self.rings = []
+        
+    def tearDown(self):
+        for ring in self.rings:
+            ring.close()
+            ring.unlink()
+        
+    def make_ring(self, **kwargs):
+        ring = shm.SharedRing(**kwargs)
+        self.rings.append(ring)
+        return ring
+
+    def test_write_poll(self):
+        ring = self.make_ring(frame_size=4, n_frames=4)
+        signal = fastwire.Signal()
+        received = []
+
+        def connected(frame, seq):
+            received.append((bytes(frame), seq))
+
+        signal.connect(connected)
+        sub = shm.RingSubscriber(ring, signal)
+        ring.write(b'abcd')
+        ring.write(b'efgh')
+        self.assertEqual(sub.poll(), 2)
+        self.assertEqual(received, [(b'abcd', 1), (b'efgh', 2)])
+        self.assertEqual(sub.poll(), 0)
+        self.assertEqual(sub.overruns, 0)
+
+    def test_claim_publish(self):
+        ring = self.make_ring(frame_size=4, n_frames=4)
+        signal = fastwire.Signal()
+        received = []
+
+        def connected(frame, seq):
+            received.append(bytes(frame))
+
+        signal.connect(connected)
+        sub = shm.RingSubscriber(ring, signal)
+        view = ring.claim()
+        view[:] = b'wxyz'
+        self.assertEqual(sub.poll(), 0)
+        self.assertEqual(ring.publish(), 1)
+        sub.poll()
+        self.assertEqual(received, [b'wxyz'])
+
+    def test_overrun(self):
+        ring = self.make_ring(frame_size=1, n_frames=4)
+        signal = fastwire.Signal()
+        received = []
+
+        def connected(frame, seq):
+            received.append(seq)
+
+        signal.connect(connected)
+        sub = shm.RingSubscriber(ring, signal)
+        for i in range(10):
+            ring.write(bytes([i]))
+        sub.poll()
+        self.assertEqual(received, [7, 8, 9, 10])
+        self.assertEqual(sub.overruns, 6)
+    
+    def test_overrun_during_emit(self):
+        ring = self.make_ring(frame_size=1, n_frames=2)
+        signal = fastwire.Signal()
+
+        def connected(frame, seq):
+            if seq == 1:
+                ring.write(b'x')
+                ring.write(b'y')
+
+        signal.connect(connected)
+        sub = shm.RingSubscriber(ring, signal)
+        ring.write(b'a')
+        sub.poll()
+        self.assertEqual(sub.overruns, 1)
+
+    def test_start_stop(self):
+        ring = self.make_ring(frame_size=1, n_frames=4)
+        signal = fastwire.Signal()
+        event = threading.Event()
+
+        def connected(frame, seq):
+            event.set()
+
+        signal.connect(connected)
+        sub = shm.RingSubscriber(ring, signal)
+        sub.start()
+        ring.write(b'a')
+        self.assertTrue(event.wait(5))
+        sub.stop()
+
+    def test_receiver_error(self):
+        ring = self.make_ring(frame_size=1, n_frames=4)
+        signal = fastwire.Signal()
+        received = []
+        event = threading.Event()
+
+        def connected(frame, seq):
+            if seq == 1:
+                raise ValueError('Failed')
+            received.append(seq)
+            event.set()
+
+        signal.connect(connected)
+        sub = shm.RingSubscriber(ring, signal)
+        with self.assertLogs('fastwire.shm', 'ERROR'):
+            sub.start()
+            ring.write(b'a')
+            ring.write(b'b')
+            self.assertTrue(event.wait(5))
+        sub.stop()
+        self.assertEqual(received, [2])
+
+    @unittest.skipIf(np is None, 'NumPy is not installed')
+    def test_numpy_frames(self):
+        ring = self.make_ring(shape=(2, 3), dtype='float32', n_frames=4)
+        signal = fastwire.Signal()
+        received = []
+
+        def connected(frame, seq):
+            received.append(frame.copy())
+
+        signal.connect(connected)
+        sub = shm.RingSubscriber(ring.name, signal, shape=(2, 3),
+                                 dtype='float32')
+        ring.write(np.arange(6).reshape(2, 3))
+        sub.poll()
+        np.testing.assert_array_equal(received[0],
+                                      np.arange(6).reshape(2, 3))
+        self.assertEqual(received[0].dtype, np.float32)
+        sub.ring.close()
+        
+    def test_subscriber_process(self):
+        ring = self.make_ring(frame_size=3, n_frames=8)
+        conn_a, conn_b = multiprocessing.Pipe()
+        p = multiprocessing.Process(target=subscriber,
+                                    args=(ring.name, conn_b))
+        p.start()
+        self.assertEqual(conn_a.recv(), 'ready')
+        for i in range(5):
+            ring.write(bytes([i, i, i]))
+        conn_a.send('go')
+        totals, overruns = conn_a.recv()
+        p.join(10)
+        self.assertEqual(totals, [0, 3, 6, 9, 12])
+        self.assertEqual(overruns, 0)
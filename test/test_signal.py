@@ -7,6 +7,8 @@ Created on Sun Jul 21 22:22:31 2019
 
 import fastwire
 
+import threading
+import time
 import unittest
 
 
@@ -150,4 +152,677 @@ class Test_Signal(unittest.TestCase):
         ret = signal.fetch(a=val)
         self.assertEqual(ret, val)
             
-    
\ No newline at end of file
+    
+    def test_fetch_iter(self):
+        signal = fastwire.Signal()
+        calls = []
+
+        def supply_a(a):
+            calls.append('a')
+            return a
+        
+        def supply_b(a):
+            calls.append('b')
+            return a * 2
+
+        signal.connect(supply_a)
+        signal.connect(supply_b)
+        it = signal.fetch_iter(a=3)
+        self.assertEqual(calls, [])
+        self.assertEqual(next(it), 3)
+        self.assertEqual(calls, ['a'])
+        self.assertEqual(list(it), [6])
+
+    def test_fetch_first(self):
+        signal = fastwire.Signal()
+        calls = []
+
+        def supply_none():
+            calls.append('none')
+        
+        def supply_val():
+            calls.append('val')
+            return 5
+        
+        def supply_other():
+            calls.append('other')
+            return 6
+
+        signal.connect(supply_none)
+        signal.connect(supply_val)
+        signal.connect(supply_other)
+        self.assertEqual(signal.fetch_first(), 5)
+        self.assertEqual(calls, ['none', 'val'])
+        
+    def test_fetch_first_default(self):
+        signal = fastwire.Signal()
+        
+        def supply_none():
+            pass
+        
+        signal.connect(supply_none)
+        self.assertEqual(signal.fetch_first(default='x'), 'x')
+
+    def test_fetch_any(self):
+        signal = fastwire.Signal()
+        calls = []
+
+        def supply_false(a):
+            calls.append('false')
+            return False
+        
+        def supply_true(a):
+            calls.append('true')
+            return a > 2
+        
+        def supply_other(a):
+            calls.append('other')
+            return True
+
+        signal.connect(supply_false)
+        signal.connect(supply_true)
+        signal.connect(supply_other)
+        self.assertTrue(signal.fetch_any(a=3))
+        self.assertEqual(calls, ['false', 'true'])
+        calls.clear()
+        self.assertTrue(signal.fetch_any(a=1))
+        self.assertEqual(calls, ['false', 'true', 'other'])
+
+    def test_fetch_reduce(self):
+        signal = fastwire.Signal()
+        calls = []
+
+        def make(val):
+            def supply():
+                calls.append(val)
+                return val
+            return supply
+
+        suppliers = [make(v) for v in [1, 2, 3, 4]]
+        for supplier in suppliers:
+            signal.connect(supplier)
+        total = signal.fetch_reduce(lambda acc, v: acc + v, 0)
+        self.assertEqual(total, 10)
+        calls.clear()
+        total = signal.fetch_reduce(lambda acc, v: acc + v, 0,
+                                    until=lambda acc: acc >= 3)
+        self.assertEqual(total, 3)
+        self.assertEqual(calls, [1, 2])
+
+    def test_priority(self):
+        signal = fastwire.Signal()
+        calls = []
+
+        def low(a):
+            calls.append('low')
+
+        def mid(a):
+            calls.append('mid')
+
+        def high(a):
+            calls.append('high')
+
+        def mid_2(a):
+            calls.append('mid_2')
+
+        signal.connect(low, priority=-1)
+        signal.connect(mid)
+        signal.connect(high, priority=10)
+        signal.connect(mid_2)
+        signal.emit(a=1)
+        self.assertEqual(calls, ['high', 'mid', 'mid_2', 'low'])
+        self.assertEqual(signal.receivers(), [high, mid, mid_2, low])
+        
+    def test_priority_disconnect(self):
+        signal = fastwire.Signal()
+        calls = []
+
+        def low(a):
+            calls.append('low')
+
+        def high(a):
+            calls.append('high')
+
+        signal.connect(low)
+        receiver_id = signal.connect(high, priority=1)
+        signal.disconnect(receiver_id)
+        signal.emit(a=1)
+        self.assertEqual(calls, ['low'])
+
+    def test_stop(self):
+        signal = fastwire.Signal()
+        calls = []
+
+        def cache(a):
+            calls.append('cache')
+            if a == 1:
+                return fastwire.STOP
+
+        def expensive(a):
+            calls.append('expensive')
+
+        signal.connect(expensive)
+        signal.connect(cache, priority=1)
+        signal.emit(a=1)
+        self.assertEqual(calls, ['cache'])
+        signal.emit(a=2)
+        self.assertEqual(calls, ['cache', 'cache', 'expensive'])
+
+    def test_connect_many(self):
+        signal = fastwire.Signal()
+        calls = []
+
+        def make(val):
+            def connected(a):
+                calls.append(val)
+            return connected
+
+        receivers = [make(i) for i in range(5)]
+        first = make('first')
+        signal.connect(first, priority=1)
+        receiver_ids = signal.connect_many(receivers)
+        self.assertEqual(len(set(receiver_ids)), 5)
+        self.assertEqual(signal.n, 6)
+        signal.emit(a=1)
+        self.assertEqual(calls, ['first', 0, 1, 2, 3, 4])
+        
+    def test_collected_while_sorting(self):
+        signal = fastwire.Signal()
+        calls = []
+
+        class A():
+            def __init__(self, val):
+                self.val = val
+
+            def connected(self, a):
+                calls.append(self.val)
+
+        doomed = [A('doomed')]
+        signal.connect(doomed[0].connected)
+        objs = [A(i) for i in range(6)]
+        entry = signal._entry
+        entries = []
+
+        def _entry(receiver_id):
+            entries.append(receiver_id)
+            if len(entries) == 4:
+                doomed.clear() # Its finalizer runs mid sort
+            return entry(receiver_id)
+
+        signal._entry = _entry
+        signal.connect_many([a.connected for a in objs])
+        self.assertEqual(signal.n, 6)
+        self.assertEqual([e[0] for e in signal._dispatch],
+                         [key[1] for key in signal._order])
+        signal.emit(a=1)
+        self.assertEqual(calls, [0, 1, 2, 3, 4, 5])
+
+    def test_connect_many_limit(self):
+        signal = fastwire.Signal(receiver_limit=2)
+
+        def connected(a):
+            pass
+
+        with self.assertRaises(KeyError):
+            signal.connect_many([connected] * 3)
+        self.assertEqual(signal.n, 0)
+
+    def test_disconnect_many(self):
+        signal = fastwire.Signal()
+        calls = []
+
+        def make(val):
+            def connected(a):
+                calls.append(val)
+            return connected
+
+        receivers = [make(i) for i in range(5)]
+        receiver_ids = signal.connect_many(receivers)
+        signal.disconnect_many(receiver_ids[1:4])
+        signal.emit(a=1)
+        self.assertEqual(calls, [0, 4])
+        
+    def test_disconnect_all(self):
+        signal_1 = fastwire.Signal()
+        signal_2 = fastwire.Signal()
+
+        class A():
+            def connected(self, a):
+                self._a = a
+                
+            def other(self, a):
+                self._a = a
+
+        a = A()
+        b = A()
+        signal_1.connect(a.connected)
+        signal_1.connect(b.connected)
+        signal_2.connect(a.connected)
+        signal_2.connect(a.other)
+        self.assertEqual(fastwire.disconnect_all(a), 3)
+        self.assertEqual(signal_1.n, 1)
+        self.assertEqual(signal_2.n, 0)
+        self.assertEqual(fastwire.disconnect_all(a), 0)
+        
+    def test_disconnect_detaches_finalizer(self):
+        signal = fastwire.Signal()
+
+        def connected(a):
+            pass
+
+        receiver_id = signal.connect(connected)
+        finalizer = signal._finalizers[receiver_id]
+        signal.disconnect(receiver_id)
+        self.assertFalse(finalizer.alive)
+        self.assertEqual(signal._finalizers, {})
+
+    def test_connections(self):
+        signal_1 = fastwire.Signal()
+        signal_2 = fastwire.Signal()
+
+        class A():
+            def connected(self, a):
+                self._a = a
+
+        a = A()
+        id_1 = signal_1.connect(a.connected)
+        id_2 = signal_2.connect(a.connected)
+        self.assertEqual(fastwire.connection_count(a), 2)
+        self.assertEqual(set(fastwire.connections(a)),
+                         {(signal_1, id_1), (signal_2, id_2)})
+        signal_1.disconnect(id_1)
+        self.assertEqual(fastwire.connections(a), [(signal_2, id_2)])
+        del a
+        self.assertEqual(signal_2.n, 0)
+
+    def test_leak_report(self):
+        signal = fastwire.Signal()
+
+        class A():
+            def connected(self, a):
+                self._a = a
+
+        a = A()
+        b = A()
+        for i in range(5):
+            signal.connect(a.connected)
+        signal.connect(b.connected)
+        report = fastwire.leak_report(min_connections=5, signals={signal})
+        self.assertEqual(report, [(a, 5)])
+        report = fastwire.leak_report(min_connections=5, signals=set())
+        self.assertEqual(report, [])
+
+    def test_strong(self):
+        signal = fastwire.Signal()
+        received = []
+        signal.connect(lambda a: received.append(a), strong=True)
+        signal.emit(a=1)
+        self.assertEqual(received, [1])
+        self.assertEqual(signal._finalizers, {})
+        
+    def test_strong_method(self):
+        signal = fastwire.Signal()
+
+        class A():
+            def connected(self, a):
+                self._a = a
+
+        a = A()
+        receiver_id = signal.connect(a.connected, strong=True)
+        self.assertEqual(fastwire.connections(a), [(signal, receiver_id)])
+        report = fastwire.leak_report(min_connections=1, signals=[signal])
+        self.assertEqual(report, [(a, 1)])
+        signal.emit(a=5)
+        self.assertEqual(a._a, 5)
+        fastwire.disconnect_all(a)
+        self.assertEqual(signal.n, 0)
+        self.assertEqual(signal._strong, set())
+
+    def test_filter_kwargs(self):
+        signal = fastwire.Signal(filter_kwargs=True)
+        received = []
+
+        def only_a(a):
+            received.append(('only_a', a))
+
+        def any_kwargs(a, **kwargs):
+            received.append(('any_kwargs', a, kwargs))
+
+        class A():
+            def connected(self, b=None):
+                received.append(('A', b))
+
+        a = A()
+        signal.connect(only_a)
+        signal.connect(any_kwargs)
+        signal.connect(a.connected)
+        signal.emit(a=1, b=2)
+        self.assertEqual(received, [('only_a', 1),
+                                    ('any_kwargs', 1, {'b': 2}),
+                                    ('A', 2)])
+        received.clear()
+        signal.emit(a=3) # Passed unfiltered to only_a
+        self.assertEqual(received, [('only_a', 3),
+                                    ('any_kwargs', 3, {}),
+                                    ('A', None)])
+
+    def test_filter_kwargs_condition(self):
+        signal = fastwire.Signal(filter_kwargs=True)
+        received = []
+
+        def only_a(a):
+            received.append(a)
+
+        class Positive_B():
+            name = 'positive_b'
+            def check(self, b, **kwargs):
+                return b > 0
+
+        signal.add_condition(Positive_B())
+        signal.connect(only_a)
+        signal.emit(a=1, b=2)
+        signal.emit(a=3, b=-1)
+        signal.remove_condition('positive_b')
+        signal.emit(a=4, b=-1)
+        self.assertEqual(received, [1, 4])
+
+    def test_filter_kwargs_fetch(self):
+        signal = fastwire.Signal(filter_kwargs=True)
+
+        def only_a(a):
+            return a
+
+        def a_and_b(a, b):
+            return a + b
+
+        def any_kwargs(**kwargs):
+            return len(kwargs)
+
+        signal.connect(only_a, priority=2)
+        signal.connect(a_and_b, priority=1)
+        signal.connect(any_kwargs)
+        self.assertEqual(signal.fetch_all(a=1, b=2), [1, 3, 2])
+        self.assertEqual(list(signal.fetch_iter(a=1, b=2)), [1, 3, 2])
+        self.assertEqual(signal.fetch_first(a=1, b=2), 1)
+        self.assertTrue(signal.fetch_any(a=1, b=2))
+        self.assertEqual(signal.fetch_reduce(lambda x, y: x + y, 0,
+                                             a=1, b=2), 6)
+        single = fastwire.Signal(receiver_limit=1, filter_kwargs=True)
+        single.connect(only_a)
+        self.assertEqual(single.fetch(a=1, b=2), 1)
+
+    def test_filter_kwargs_cached(self):
+        def only_a(a):
+            pass
+
+        from fastwire.signal import _signature_cache
+        fastwire.Signal(filter_kwargs=True).connect(only_a)
+        self.assertEqual(_signature_cache[only_a][0], frozenset(['a']))
+
+    def test_freeze(self):
+        signal = fastwire.Signal()
+        received = []
+
+        class A():
+            def connected(self, a):
+                received.append(a)
+
+        a = A()
+        signal.connect(a.connected)
+        signal.freeze()
+        self.assertEqual(signal._dispatch[0][2], False)
+        del a
+        signal.emit(a=1)
+        self.assertEqual(received, [1])
+        self.assertEqual(signal.n, 1)
+        signal.unfreeze()
+        self.assertEqual(signal.n, 0)
+        signal.emit(a=2)
+        self.assertEqual(received, [1])
+
+    def test_budget(self):
+        signal = fastwire.Signal('budgeted', budget=0.005)
+        received = []
+
+        def fast(a):
+            received.append(('fast', a))
+
+        def slow(a):
+            time.sleep(0.02)
+            received.append(('slow', a))
+
+        signal.connect(fast)
+        slow_id = signal.connect(slow, priority=1)
+        with self.assertLogs('fastwire.signal', 'WARNING') as logs:
+            signal.emit(a=1)
+            signal.emit(a=2)
+        self.assertEqual(len(logs.output), 2)
+        self.assertIn('test_budget.<locals>.slow', logs.output[0])
+        self.assertEqual(received, [('slow', 1), ('fast', 1), ('slow', 2),
+                                    ('fast', 2)])
+        stats = signal.overruns()
+        self.assertEqual(list(stats), [slow_id])
+        self.assertEqual(stats[slow_id]['count'], 2)
+        self.assertGreater(stats[slow_id]['worst'], 0.01)
+        self.assertFalse(stats[slow_id]['demoted'])
+        signal.set_budget(None)
+        self.assertEqual(signal.overruns(), {})
+        self.assertEqual(signal.emit, signal._emit)
+
+    def test_budget_demote(self):
+        signal = fastwire.Signal('budgeted')
+        signal.set_budget(0.005, demote=True)
+        received = []
+        done = threading.Event()
+
+        def fast(a):
+            received.append(('fast', a))
+
+        def slow(a):
+            time.sleep(0.02)
+            received.append(('slow', a))
+            if a == 2:
+                done.set()
+
+        signal.connect(fast)
+        slow_id = signal.connect(slow, priority=1)
+        with self.assertLogs('fastwire.signal', 'WARNING') as logs:
+            signal.emit(a=1)
+        self.assertIn('demoted', logs.output[0])
+        t0 = time.perf_counter()
+        signal.emit(a=2) # slow is called in the background now
+        self.assertLess(time.perf_counter() - t0, 0.01)
+        self.assertTrue(done.wait(5))
+        self.assertEqual(received, [('slow', 1), ('fast', 1), ('fast', 2),
+                                    ('slow', 2)])
+        self.assertTrue(signal.overruns()[slow_id]['demoted'])
+
+    def test_budget_with_condition(self):
+        signal = fastwire.Signal(budget=1, filter_kwargs=True)
+        received = []
+
+        def connected(a):
+            received.append(a)
+
+        signal.connect(connected)
+        signal.add_condition(fastwire.C.lt('a', 10))
+        self.assertEqual(signal.emit, signal._budgeted_emit)
+        signal.emit(a=5, b=1)
+        signal.emit(a=15, b=1)
+        signal.mute()
+        signal.emit(a=6)
+        signal.unmute()
+        signal.remove_condition("C.lt('a', 10)")
+        signal.emit(a=20)
+        self.assertEqual(received, [5, 20])
+        self.assertEqual(signal.emit, signal._budgeted_emit)
+
+    def test_isolate(self):
+        signal = fastwire.Signal('isolated', isolate=True)
+        received = []
+
+        def first(a):
+            raise ValueError('first')
+
+        def second(a):
+            received.append(a)
+
+        def third(a):
+            raise KeyError('third')
+
+        signal.connect(first, priority=2)
+        signal.connect(second, priority=1)
+        signal.connect(third)
+        with self.assertRaises(fastwire.EmitError) as cm:
+            signal.emit(a=1)
+        self.assertEqual(received, [1])
+        errors = cm.exception.exceptions
+        self.assertEqual([type(e) for e in errors], [ValueError, KeyError])
+        self.assertIn('isolated', str(cm.exception))
+        signal.set_isolation(False)
+        with self.assertRaises(ValueError):
+            signal.emit(a=2)
+        self.assertEqual(received, [1])
+
+    def test_isolate_on_error(self):
+        reports = []
+        signal = fastwire.Signal()
+        received = []
+
+        def failing(a, **kwargs):
+            raise ValueError(a)
+
+        def connected(a, **kwargs):
+            received.append(a)
+            if a == 2:
+                return fastwire.STOP
+
+        signal.set_isolation(on_error=lambda s, e: reports.append((s, e)))
+        signal.connect(failing, priority=1, group=1)
+        signal.connect(connected, group=1)
+        signal.connect(connected, priority=-1, group=2)
+        signal.add_condition(fastwire.C.eq('group', 1) |
+                             fastwire.C.eq('a', 2))
+        signal.emit(a=1)
+        signal.emit(a=2)
+        self.assertEqual(received, [1, 2])
+        self.assertEqual(len(reports), 2)
+        self.assertIs(reports[0][0], signal)
+        self.assertEqual([str(e) for e in reports[1][1]], ['2'])
+
+    def test_reentry_raise(self):
+        a = fastwire.Signal('a', reentry='raise')
+        b = fastwire.Signal('b')
+        calls = []
+
+        def on_a(x):
+            calls.append(('a', x))
+            b.emit(x=x + 1)
+
+        def on_b(x):
+            calls.append(('b', x))
+            a.emit(x=x + 1)
+
+        a.connect(on_a)
+        b.connect(on_b)
+        with self.assertRaises(fastwire.ReentryError) as cm:
+            a.emit(x=0)
+        self.assertEqual(calls, [('a', 0), ('b', 1)])
+        self.assertIn('a -> a', str(cm.exception))
+        a.set_reentry(None)
+        self.assertEqual(a.emit, a._emit)
+
+    def test_reentry_skip(self):
+        signal = fastwire.Signal(reentry='skip')
+        calls = []
+
+        def connected(x):
+            calls.append(x)
+            signal.emit(x=x + 1)
+
+        signal.connect(connected)
+        signal.emit(x=0)
+        signal.emit(x=10)
+        self.assertEqual(calls, [0, 10])
+
+    def test_reentry_defer(self):
+        signal = fastwire.Signal('count')
+        signal.set_reentry('defer')
+        calls = []
+
+        def first(x):
+            calls.append(('first', x))
+            if x < 3:
+                signal.emit(x=x + 1)
+
+        def second(x):
+            calls.append(('second', x))
+
+        signal.connect(first, priority=1)
+        signal.connect(second)
+        signal.emit(x=0)
+        self.assertEqual(calls, [('first', 0), ('second', 0),
+                                 ('first', 1), ('second', 1),
+                                 ('first', 2), ('second', 2),
+                                 ('first', 3), ('second', 3)])
+
+    def test_reentry_max_depth(self):
+        signals = [fastwire.Signal(str(i), reentry='raise', max_depth=3)
+                   for i in range(5)]
+        calls = []
+
+        def make(i):
+            def connected():
+                calls.append(i)
+                if i + 1 < len(signals):
+                    signals[i + 1].emit()
+            return connected
+
+        receivers = [make(i) for i in range(5)]
+        for signal, receiver in zip(signals, receivers):
+            signal.connect(receiver)
+        with self.assertRaises(fastwire.ReentryError) as cm:
+            signals[0].emit()
+        self.assertEqual(calls, [0, 1, 2])
+        self.assertIn('0 -> 1 -> 2 -> 3', str(cm.exception))
+
+    def test_reentry_threads(self):
+        signal = fastwire.Signal(reentry='raise')
+        started = threading.Event()
+        release = threading.Event()
+        calls = []
+
+        def connected(x):
+            calls.append(x)
+            if x == 0:
+                started.set()
+                release.wait(5)
+
+        signal.connect(connected)
+        thread = threading.Thread(target=signal.emit, kwargs={'x': 0})
+        thread.start()
+        self.assertTrue(started.wait(5))
+        signal.emit(x=1) # Not reentry - the first emit is in another thread
+        release.set()
+        thread.join()
+        self.assertEqual(sorted(calls), [0, 1])
+
+    def test_bad_reentry(self):
+        with self.assertRaises(ValueError):
+            fastwire.Signal(reentry='wait')
+
+    def test_reentry_defer_error(self):
+        signal = fastwire.Signal(reentry='defer')
+        calls = []
+
+        def connected(a):
+            calls.append(a)
+            if a == 1:
+                signal.emit(a=2)
+                raise ValueError('Failed')
+
+        signal.connect(connected)
+        with self.assertRaises(ValueError):
+            signal.emit(a=1)
+        signal.emit(a=10)
+        self.assertEqual(calls, [1, 10])
@@ -8,6 +8,8 @@ Created on Sun Jul 21 22:46:33 2019
 import fastwire
 
 import unittest
+import asyncio
+import threading
 
 
 class Test_SignalBox(unittest.TestCase):
@@ -118,3 +120,145 @@ class Test_SignalBox(unittest.TestCase):
         self.assertEqual(len(sb._cs), 2)
         del a
         self.assertEqual(len(sb._cs), 1)
+
+    def test_remove_from_other_thread(self):
+        sb = fastwire.SignalBox()
+        sb.add('view')
+        handle = sb.handle('x')
+        thread = threading.Thread(target=sb.remove, args=('view',))
+        thread.start()
+        thread.join()
+        default = sb.get_container('default')
+        self.assertIs(sb.get_active(), default)
+        self.assertIs(sb.get('x'), default['x'])
+        self.assertIs(sb['x'], default['x'])
+        self.assertIs(sb.at(handle), default['x'])
+
+    def test_activate_context(self):
+        sb = fastwire.SignalBox()
+        sb.add('outer')
+        with sb.activate('inner') as c:
+            self.assertEqual(sb.active, 'inner')
+            self.assertIs(sb.get_active(), c)
+            signal = sb['this_name']
+        self.assertEqual(sb.active, 'outer')
+        self.assertIs(sb.get_container('inner')['this_name'], signal)
+        self.assertFalse('this_name' in sb.get_container('outer'))
+
+    def test_active_per_thread(self):
+        sb = fastwire.SignalBox()
+        sb.add('main')
+        results = {}
+        
+        def work(i):
+            results[i] = [sb.active]
+            sb.add(i)
+            results[i].append(sb['signal'])
+            
+        threads = [threading.Thread(target=work, args=(i,))
+                   for i in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertEqual(sb.active, 'main')
+        for i in range(4):
+            self.assertEqual(results[i][0], 'default')
+            self.assertIs(results[i][1], sb.get_container(i)['signal'])
+            
+    def test_active_per_task(self):
+        sb = fastwire.SignalBox()
+        
+        async def work(i):
+            with sb.activate(i):
+                await asyncio.sleep(0)
+                return sb.active, sb['signal']
+            
+        async def main():
+            return await asyncio.gather(*[work(i) for i in range(4)])
+        
+        results = asyncio.run(main())
+        for i, (active, signal) in enumerate(results):
+            self.assertEqual(active, i)
+            self.assertIs(signal, sb.get_container(i)['signal'])
+        self.assertEqual(sb.active, 'default')
+
+    def test_handle(self):
+        sb = fastwire.SignalBox()
+        handle = sb.handle('this_name')
+        signal_default = sb.at(handle)
+        sb.add('other')
+        signal_other = sb.at(handle)
+        self.assertIsNot(signal_default, signal_other)
+        self.assertIs(signal_other, sb['this_name'])
+        self.assertIs(signal_default, 
+                      sb.get_container('default')['this_name'])
+        self.assertEqual(sb.get_container('other').handle('this_name'),
+                         handle)
+
+    def test_handle_many_containers(self):
+        sb = fastwire.SignalBox()
+        for i in range(1000):
+            sb.add(i)
+            sb.get('signal_' + str(i))
+        c = sb.get_container(999)
+        self.assertTrue(len(c._signals) < 10)
+        handle = sb.handle('signal_999')
+        self.assertIs(c.at(handle), c['signal_999'])
+        self.assertIs(sb.get_container(0).at(handle),
+                      sb.get_container(0)['signal_999'])
+
+    def test_query(self):
+        sb = fastwire.SignalBox()
+        sb.index_attr('unit')
+        a = sb.get('a', attrs={'unit': 'mm'})
+        sb.add('other')
+        self.assertEqual(sb.get_container('other').indexed_attrs, ['unit'])
+        b = sb.get('b', attrs={'unit': 'mm'})
+        c = sb.get('c', attrs={'unit': 'm'})
+        self.assertEqual(sb.query(unit='mm'), [a, b])
+        self.assertEqual(sb.query(unit='m'), [c])
+
+    def test_connections(self):
+        sb = fastwire.SignalBox()
+        other = fastwire.Signal()
+
+        class A():
+            def connected(self, a):
+                self._a = a
+
+        a = A()
+        receiver_id = sb['this_name'].connect(a.connected)
+        other.connect(a.connected)
+        self.assertEqual(sb.connections(a), [(sb['this_name'], receiver_id)])
+        self.assertEqual(sb.leak_report(min_connections=1), [(a, 1)])
+
+    def test_freeze(self):
+        sb = fastwire.SignalBox()
+        
+        class A():
+            def connected(self, a):
+                self._a = a
+
+        a = A()
+        sb['this_name'].connect(a.connected)
+        sb.get_container('other')['that_name'].connect(a.connected)
+        sb.freeze(gc_freeze=False)
+        signals = [sb['this_name'], sb.get_container('other')['that_name']]
+        for s in signals:
+            self.assertEqual([weak for i, ref, weak in s._dispatch], [False])
+        sb.unfreeze()
+        for s in signals:
+            self.assertEqual([weak for i, ref, weak in s._dispatch], [True])
+
+    def test_memory_report(self):
+        sb = fastwire.SignalBox()
+        sb['this_name'].connect(lambda a: None, strong=True)
+        sb.get_container('other')['that_name']
+        report = sb.memory_report()
+        self.assertEqual(set(report['containers']), {'default', 'other'})
+        self.assertEqual(report['total']['signals']['count'], 2)
+        self.assertEqual(report['total']['receivers']['count'], 1)
+        self.assertEqual(
+            report['total']['signals']['bytes'],
+            sum(r['signals']['bytes'] for r in report['containers'].values()))
@@ -37,4 +37,111 @@ class Test_SignalContainer(unittest.TestCase):
         sc = fastwire.SignalContainer()
         wire_1 = sc.get('this_name')
         wire_2 = sc.get('this_name')
-        self.assertEqual(wire_1, wire_2)
\ No newline at end of file
+        self.assertEqual(wire_1, wire_2)
+
+    def test_handle(self):
+        sc = fastwire.SignalContainer()
+        signal = sc.get('this_name')
+        handle = sc.handle('this_name')
+        self.assertEqual(handle, sc.handle('this_name'))
+        self.assertIs(sc.at(handle), signal)
+
+    def test_handle_before_signal(self):
+        sc = fastwire.SignalContainer()
+        handle = sc.handle('this_name')
+        self.assertFalse('this_name' in sc)
+        signal = sc.at(handle)
+        self.assertEqual(signal.name, 'this_name')
+        self.assertIs(sc['this_name'], signal)
+        self.assertIs(sc.at(handle), signal)
+
+    def test_query(self):
+        sc = fastwire.SignalContainer()
+        sc.index_attr('unit')
+        a = sc.get('a', attrs={'unit': 'mm', 'axis': 'x'})
+        b = sc.get('b', attrs={'unit': 'mm', 'axis': 'y'})
+        c = sc.get('c', attrs={'unit': 'm'})
+        d = sc.get('d')
+        self.assertEqual(sc.query(unit='mm'), [a, b])
+        self.assertEqual(sc.query(unit='mm', axis='y'), [b])
+        self.assertEqual(sc.query(axis='x'), [a])
+        self.assertEqual(sc.query(unit='in'), [])
+        self.assertEqual(sc.query(unit='m'), [c])
+        self.assertEqual(sc.query(), [a, b, c]) # d has no attrs
+        self.assertNotIn(d, sc.query(axis='y'))
+
+    def test_index_existing(self):
+        sc = fastwire.SignalContainer()
+        a = sc.get('a', attrs={'unit': 'mm'})
+        sc.index_attr('unit')
+        self.assertEqual(sc.indexed_attrs, ['unit'])
+        self.assertEqual(sc._index['unit']['mm'], [a])
+        b = sc.get('b', attrs={'unit': 'mm'})
+        self.assertEqual(sc._index['unit']['mm'], [a, b])
+
+    def test_query_bulk(self):
+        sc = fastwire.SignalContainer()
+        sc.index_attr('unit')
+        a = sc.get('a', attrs={'unit': 'mm'})
+        b = sc.get('b', attrs={'unit': 'mm'})
+        received = []
+
+        def connected(v):
+            received.append(v)
+
+        found = sc.query(unit='mm')
+        self.assertEqual(len(found.connect(connected)), 2)
+        a.emit(v=1)
+        b.emit(v=2)
+        found.mute()
+        a.emit(v=3)
+        found.unmute()
+        b.emit(v=4)
+        self.assertEqual(received, [1, 2, 4])
+
+    def test_connect_map(self):
+        sc = fastwire.SignalContainer()
+        received = []
+
+        def connected_a(v):
+            received.append(('a', v))
+
+        def connected_b(v):
+            received.append(('b', v))
+
+        ids = sc.connect_map({'x': [connected_a, connected_b],
+                              'y': [connected_b]})
+        self.assertEqual(len(ids['x']), 2)
+        self.assertEqual(len(ids['y']), 1)
+        sc['x'].emit(v=1)
+        sc['y'].emit(v=2)
+        self.assertEqual(received, [('a', 1), ('b', 1), ('b', 2)])
+
+    def test_memory_report(self):
+        c = fastwire.SignalContainer()
+
+        class A():
+            def connected(self, a):
+                pass
+
+        class Limit_Condition():
+            name = 'limit'
+            def check(self, **kwargs):
+                return True
+
+        a = A()
+        c.get('one').connect(a.connected, limit=3)
+        c.get('one').connect(lambda a: None, strong=True)
+        c.get('two').connect(a.connected)
+        c.get('two').add_condition(Limit_Condition())
+        report = c.memory_report()
+        counts = {key: value['count'] for key, value in report.items()}
+        self.assertEqual(counts, {'signals': 2, 'receivers': 3,
+                                  'receiver_kwargs': 1, 'conditions': 1,
+                                  'finalizers': 2})
+        for value in report.values():
+            self.assertTrue(value['bytes'] > 0)
+        del a
+        report = c.memory_report()
+        self.assertEqual(report['finalizers']['count'], 0)
+        self.assertEqual(report['receivers']['count'], 1)
@@ -0,0 +1,118 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 11:14:08 2026
+
+@author: Reuben
+"""
+
+import fastwire
+
+import unittest
+import threading
+
+
+def run_threads(target, n_threads, *args):
+    errors = []
+    barrier = threading.Barrier(n_threads)
+    
+    def run(i):
+        try:
+            barrier.wait()
+            target(i, *args)
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=run, args=(i,))
+               for i in range(n_threads)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return errors
+
+
+class Test_Threading(unittest.TestCase):
+
+    def test_connect_disconnect_emit(self):
+        signal = fastwire.Signal()
+        counts = [0] * 8
+        
+        def emitter(i):
+            for j in range(2000):
+                signal.emit(a=j)
+        
+        def connector(i):
+            def connected(a):
+                counts[i] += 1
+            for j in range(500):
+                receiver_id = signal.connect(connected, priority=j % 3)
+                signal.emit(a=j)
+                signal.disconnect(receiver_id)
+        
+        def work(i):
+            if i < 4:
+                emitter(i)
+            else:
+                connector(i)
+            
+        errors = run_threads(work, 8)
+        self.assertEqual(errors, [])
+        self.assertEqual(signal.n, 0)
+        self.assertEqual(signal._dispatch, ())
+        for i in range(4, 8):
+            self.assertTrue(counts[i] >= 500)
+
+    def test_receiver_ids_unique(self):
+        signal = fastwire.Signal()
+        ids = []
+        
+        def connected(a):
+            pass
+        
+        def work(i):
+            for j in range(1000):
+                ids.append(signal.connect(connected))
+            
+        errors = run_threads(work, 8)
+        self.assertEqual(errors, [])
+        self.assertEqual(len(set(ids)), 8000)
+        self.assertEqual(signal.n, 8000)
+        self.assertEqual(len(signal._dispatch), 8000)
+
+    def test_container_get(self):
+        sc = fastwire.SignalContainer()
+        results = [[] for i in range(8)]
+        
+        def work(i):
+            for j in range(200):
+                results[i].append(sc.get('signal_' + str(j)))
+                
+        errors = run_threads(work, 8)
+        self.assertEqual(errors, [])
+        self.assertEqual(len(sc), 200)
+        for i in range(1, 8):
+            for a, b in zip(results[0], results[i]):
+                self.assertIs(a, b)
+                
+    def test_box_add(self):
+        sb = fastwire.SignalBox()
+        
+        def work(i):
+            for j in range(200):
+                sb.add(activate=False)
+                sb.get_container('shared_' + str(j))
+                
+        errors = run_threads(work, 8)
+        self.assertEqual(errors, [])
+        self.assertEqual(len(sb.containers), 1 + 1600 + 200)
+        
+    def test_signal_box_registry(self):
+        boxes = []
+        
+        def work(i):
+            boxes.append(fastwire.get_signal_box('threading_test'))
+            
+        errors = run_threads(work, 8)
+        self.assertEqual(errors, [])
+        for b in boxes:
+            self.assertIs(b, boxes[0])
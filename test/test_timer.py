@@ -0,0 +1,150 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 16:02:51 2026
+
+@author: Reuben
+"""
+
+import fastwire
+
+import asyncio
+import threading
+import time
+import unittest
+
+
+class Test_TimerService(unittest.TestCase):
+
+    def setUp(self):
+        self.box = fastwire.SignalBox()
+        self.service = fastwire.TimerService(self.box)
+
+    def tearDown(self):
+        self.service.stop()
+
+    def test_after(self):
+        done = threading.Event()
+        received = []
+
+        def connected(a):
+            received.append(a)
+            done.set()
+
+        self.box['tick'].connect(connected)
+        timer = self.service.after(0.01, 'tick', a=5)
+        self.assertTrue(done.wait(5))
+        self.assertEqual(received, [5])
+        self.assertFalse(timer.active)
+        self.assertEqual(self.service.pending, 0)
+
+    def test_order(self):
+        done = threading.Event()
+        received = []
+
+        def connected(a):
+            received.append(a)
+            if len(received) == 3:
+                done.set()
+
+        signal = self.box['tick']
+        signal.connect(connected)
+        self.service.after(0.03, signal, a=3)
+        self.service.after(0.01, signal, a=1)
+        self.service.after(0.02, signal, a=2)
+        self.assertTrue(done.wait(5))
+        self.assertEqual(received, [1, 2, 3])
+
+    def test_every(self):
+        done = threading.Event()
+        received = []
+
+        def connected():
+            received.append(time.monotonic())
+            if len(received) == 3:
+                done.set()
+
+        self.box['tick'].connect(connected)
+        timer = self.service.every(0.01, 'tick')
+        self.assertTrue(done.wait(5))
+        timer.cancel()
+        self.assertFalse(timer.active)
+        n = len(received)
+        time.sleep(0.05)
+        self.assertEqual(len(received), n)
+
+    def test_cancel(self):
+        received = []
+
+        def connected():
+            received.append(1)
+
+        self.box['tick'].connect(connected)
+        timers = [self.service.after(0.02, 'tick') for i in range(1000)]
+        self.assertEqual(self.service.pending, 1000)
+        for timer in timers[:-1]:
+            timer.cancel()
+        self.assertEqual(self.service.pending, 1)
+        self.assertTrue(len(self.service._heap) < 1000)
+        time.sleep(0.1)
+        self.assertEqual(received, [1])
+
+    def test_receiver_error(self):
+        done = threading.Event()
+
+        def connected():
+            done.set()
+            raise ValueError('Failed')
+
+        self.box['tick'].connect(connected)
+        with self.assertLogs('fastwire.timer', 'ERROR'):
+            self.service.after(0, 'tick')
+            self.assertTrue(done.wait(5))
+            time.sleep(0.01)
+
+
+    def test_bad_times(self):
+        with self.assertRaises(ValueError):
+            self.service.every(0, 'tick')
+        with self.assertRaises(ValueError):
+            self.service.every(1, 'tick', delay=-1)
+        with self.assertRaises(ValueError):
+            self.service.after(-1, 'tick')
+        self.assertEqual(self.service.pending, 0)
+
+    def test_reschedule_error(self):
+        done = threading.Event()
+        self.box['tick'].connect(done.set)
+        timer = self.service.every(10, 'bad', delay=0.01)
+        timer.interval = 0 # Can't be rescheduled
+        with self.assertLogs('fastwire.timer', 'ERROR'):
+            self.service.after(0.02, 'tick')
+            self.assertTrue(done.wait(5))
+        self.assertFalse(timer.active)
+        self.assertTrue(self.service._thread.is_alive())
+
+class Test_TimerService_Loop(unittest.TestCase):
+
+    def test_loop(self):
+        box = fastwire.SignalBox()
+        received = []
+
+        def connected(a):
+            received.append(a)
+
+        box['tick'].connect(connected)
+
+        async def main():
+            service = fastwire.TimerService(box, asyncio.get_running_loop())
+            service.after(0.01, 'tick', a='once')
+            timer = service.every(0.005, 'tick', a='often')
+            cancelled = service.after(0.01, 'tick', a='cancelled')
+            cancelled.cancel()
+            self.assertEqual(service.pending, 2)
+            await asyncio.sleep(0.05)
+            timer.cancel()
+            self.assertEqual(service.pending, 0)
+
+        asyncio.run(main())
+        self.assertIn('once', received)
+        self.assertNotIn('cancelled', received)
+        self.assertTrue(received.count('often') >= 3)
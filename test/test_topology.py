@@ -0,0 +1,93 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 14:31:08 2026
+
+@author: Reuben
+"""
+
+import fastwire
+
+import json
+import os
+import tempfile
+import unittest
+
+
+received = []
+
+
+def first(a):
+    received.append(('first', a))
+
+
+def second(a):
+    received.append(('second', a))
+
+
+class Handlers():
+    @staticmethod
+    def third(a):
+        received.append(('third', a))
+
+
+class Test_Topology(unittest.TestCase):
+    
+    def setUp(self):
+        received.clear()
+        
+    def make_box(self):
+        sb = fastwire.SignalBox()
+        c = sb.add('view', activate=False)
+        s = c.get('update', doc='Updates', attrs={'unit': 'mm'})
+        s.connect(second)
+        s.connect(first, priority=5)
+        s.connect(Handlers.third, strong=True)
+        s.connect(lambda a: None)
+        c.get('fetch', receiver_limit=1).connect(first)
+        return sb
+        
+    def test_export(self):
+        topology = fastwire.export_topology(self.make_box())
+        containers = dict(topology['containers'])
+        self.assertEqual(containers['default'], [])
+        update, fetch = containers['view']
+        self.assertEqual(update['name'], 'update')
+        self.assertEqual(update['doc'], 'Updates')
+        self.assertEqual(update['attrs'], {'unit': 'mm'})
+        self.assertEqual(update['receivers'], 
+                         [[__name__ + ':first', 5, {}],
+                          [__name__ + ':second', 0, {}],
+                          [__name__ + ':Handlers.third', 0, {}]])
+        self.assertEqual(fetch['receiver_limit'], 1)
+        
+    def test_save_load(self):
+        with tempfile.TemporaryDirectory() as d:
+            path = os.path.join(d, 'topology.json')
+            fastwire.save_topology(self.make_box(), path)
+            with open(path) as f:
+                json.load(f)
+            sb = fastwire.SignalBox()
+            count = fastwire.load_topology(sb, path)
+        self.assertEqual(count, 4)
+        c = sb.get_container('view')
+        c['update'].emit(a=1)
+        self.assertEqual(received, [('first', 1), ('second', 1), 
+                                    ('third', 1)])
+        self.assertEqual(c['update'].attrs, {'unit': 'mm'})
+        self.assertEqual(c['fetch'].fetch(a=2), None)
+        self.assertEqual(received[-1], ('first', 2))
+        
+    def test_bound_methods_skipped(self):
+        class A():
+            def connected(self, a):
+                pass
+        
+        a = A()
+        sb = fastwire.SignalBox()
+        sb.get('update').connect(a.connected)
+        topology = fastwire.export_topology(sb)
+        self.assertEqual(topology['containers'][0][1][0]['receivers'], [])
+        
+    def test_version(self):
+        with self.assertRaises(ValueError):
+            fastwire.apply_topology(fastwire.SignalBox(), {'version': 0})
@@ -0,0 +1,96 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 16:58:10 2026
+
+@author: Reuben
+"""
+
+import fastwire
+
+import unittest
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+class Region():
+    def __init__(self):
+        self.moves = []
+
+    def moved(self, x, **kwargs):
+        self.moves.append(x)
+
+
+@unittest.skipIf(np is None, 'NumPy is not installed')
+class Test_VectorCondition(unittest.TestCase):
+
+    def test_between(self):
+        signal = fastwire.Signal()
+        signal.add_condition(fastwire.Between('x', 'x0', 'x1'))
+        regions = [Region() for i in range(4)]
+        for i, region in enumerate(regions):
+            signal.connect(region.moved, x0=i * 10, x1=i * 10 + 10)
+        signal.emit(x=15)
+        signal.emit(x=20)
+        self.assertEqual([r.moves for r in regions], [[], [15, 20], [20], []])
+
+    def test_missing_key(self):
+        signal = fastwire.Signal()
+        signal.add_condition(fastwire.Between('x', 'x0', 'x1'))
+        region = Region()
+        other = Region()
+        signal.connect(region.moved, x0=0, x1=10)
+        signal.connect(other.moved) # No bounds
+        signal.emit(x=5)
+        signal.emit(y=5)
+        self.assertEqual(region.moves, [5])
+        self.assertEqual(other.moves, [])
+
+    def test_receivers_change(self):
+        signal = fastwire.Signal()
+        signal.add_condition(fastwire.Between('x', 'x0', 'x1'))
+        region = Region()
+        receiver_id = signal.connect(region.moved, x0=0, x1=10)
+        signal.emit(x=5)
+        late = Region()
+        signal.connect(late.moved, x0=0, x1=10, priority=1)
+        signal.emit(x=6)
+        signal.disconnect(receiver_id)
+        signal.emit(x=7)
+        self.assertEqual(region.moves, [5, 6])
+        self.assertEqual(late.moves, [6, 7])
+
+    def test_with_other_conditions(self):
+        signal = fastwire.Signal()
+        signal.add_condition(fastwire.Between('x', 'x0', 'x1'))
+        signal.add_condition(fastwire.C.eq('layer', 'top'))
+        top = Region()
+        bottom = Region()
+        signal.connect(top.moved, x0=0, x1=10, layer='top')
+        signal.connect(bottom.moved, x0=0, x1=10, layer='bottom')
+        signal.emit(x=5)
+        self.assertEqual(top.moves, [5])
+        self.assertEqual(bottom.moves, [])
+        signal.remove_condition("Between('x', 'x0', 'x1')")
+        signal.emit(x=50)
+        self.assertEqual(top.moves, [5, 50])
+
+    def test_custom(self):
+        def near(columns, kwargs):
+            return np.hypot(columns['cx'] - kwargs['x'],
+                            columns['cy'] - kwargs['y']) < 1
+
+        condition = fastwire.VectorCondition(['cx', 'cy'], near)
+        self.assertEqual(condition.name, 'near')
+        self.assertTrue(condition.check(cx=0, cy=0, x=0.5, y=0.5))
+        self.assertFalse(condition.check(cx=0, cy=0, x=1, y=1))
+        signal = fastwire.Signal(condition=condition)
+        a = Region()
+        b = Region()
+        signal.connect(a.moved, cx=0, cy=0)
+        signal.connect(b.moved, cx=5, cy=5)
+        signal.emit(x=4.5, y=5)
+        self.assertEqual(a.moves, [])
+        self.assertEqual(b.moves, [4.5])
@@ -37,4 +37,12 @@ class Test_WireContainer(unittest.TestCase):
         sc = fastwire.WireContainer()
         wire_1 = sc.get('this_name')
         wire_2 = sc.get('this_name')
-        self.assertEqual(wire_1, wire_2)
\ No newline at end of file
+        self.assertEqual(wire_1, wire_2)
+
+    def test_memory_report(self):
+        c = fastwire.WireContainer()
+        c.get('one').connect(print)
+        c.get('two')
+        report = c.memory_report()
+        self.assertEqual(report['signals']['count'], 2)
+        self.assertEqual(report['receivers']['count'], 1)